@@ -0,0 +1,154 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable
+
+from app.utils import logger
+
+BATCHING_ENABLED = os.getenv("PREDICT_BATCHING", "0").lower() in ("1", "true", "yes")
+BATCH_WINDOW_MS = float(os.getenv("BATCH_WINDOW_MS", "5"))
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "64"))
+BATCH_TIMEOUT_S = float(os.getenv("BATCH_TIMEOUT_S", "5"))
+
+_STOP = object()
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        predict_fn: Callable[[list[str]], list[dict]],
+        window_ms: float = BATCH_WINDOW_MS,
+        max_size: int = BATCH_MAX_SIZE,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        self._predict_fn = predict_fn
+        self._window = max(window_ms, 0.0) / 1000.0
+        self._max_size = max_size
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._full_batches = 0
+        self._max_seen = 0
+        self._errors = 0
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="predict-batcher", daemon=True
+            )
+            self._thread.start()
+        logger.info(
+            "Micro-batching started window_ms=%.1f max_size=%d",
+            self._window * 1000,
+            self._max_size,
+        )
+
+    def stop(self, timeout: float = 5.0):
+        thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+        self._thread = None
+        if thread.is_alive():
+            # Still inside predict_fn: it will take _STOP and finish what it
+            # holds; draining now would race it for the queue.
+            logger.warning(
+                "Micro-batcher still busy after %.1fs, not draining", timeout
+            )
+            return
+        # Requests queued behind the stop marker would otherwise wait forever.
+        leftover = 0
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(RuntimeError("micro-batcher stopped"))
+                leftover += 1
+        if leftover:
+            logger.warning("Micro-batcher stopped with %d pending requests", leftover)
+
+    def submit(self, text: str) -> Future:
+        if self._thread is None:
+            self.start()
+        fut: Future = Future()
+        self._queue.put((text, fut))
+        return fut
+
+    def predict(self, text: str) -> dict:
+        return self.submit(text).result()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self._window
+            while len(batch) < self._max_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        item = self._queue.get(timeout=remaining)
+                    else:
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._process(batch)
+
+    def _process(self, batch):
+        # Callers that timed out cancel their future; skip them.
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        texts = [text for text, _ in batch]
+        try:
+            results = self._predict_fn(texts)
+        except Exception as e:
+            logger.exception("Batched predict failed (n=%d): %s", len(batch), e)
+            with self._lock:
+                self._errors += 1
+            for _, fut in batch:
+                fut.set_exception(e)
+            return
+
+        for (_, fut), result in zip(batch, results):
+            fut.set_result(result)
+
+        with self._lock:
+            self._batches += 1
+            self._items += len(batch)
+            self._max_seen = max(self._max_seen, len(batch))
+            if len(batch) >= self._max_size:
+                self._full_batches += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            avg = self._items / self._batches if self._batches else 0.0
+            return {
+                "enabled": True,
+                "window_ms": self._window * 1000,
+                "max_size": self._max_size,
+                "batches": self._batches,
+                "items": self._items,
+                "errors": self._errors,
+                "avg_batch_size": round(avg, 3),
+                "avg_fill_ratio": round(avg / self._max_size, 4),
+                "max_batch_size_seen": self._max_seen,
+                "full_batches": self._full_batches,
+                "queue_depth": self._queue.qsize(),
+            }
@@ -1,8 +1,12 @@
 from dotenv import load_dotenv
 import os
+import threading
+import time
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from app.db_models import Base
 
 load_dotenv()
@@ -11,6 +15,155 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if DATABASE_URL is None:
     DATABASE_URL = "sqlite:///./test.db"
 
-engine = create_engine(DATABASE_URL)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1").lower() in ("1", "true", "yes")
+DB_ASYNC = os.getenv("DB_ASYNC", "0").lower() in ("1", "true", "yes")
+
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+class _PoolWaitStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            if seconds > self.wait_max:
+                self.wait_max = seconds
+
+    def timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            avg = self.wait_total / self.checkouts if self.checkouts else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "checkout_wait_avg_ms": round(avg * 1000, 3),
+                "checkout_wait_max_ms": round(self.wait_max * 1000, 3),
+                "checkout_wait_total_sec": round(self.wait_total, 6),
+            }
+
+
+_wait_stats = _PoolWaitStats()
+
+
+class TimedQueuePool(QueuePool):
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            _wait_stats.timeout()
+            raise
+        _wait_stats.observe(time.perf_counter() - t0)
+        return conn
+
+
+def to_async_url(url: str) -> str:
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {parsed.drivername}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (
+        None,
+        "",
+        ":memory:",
+    )
+
+
+def _engine_kwargs(url: str) -> dict:
+    if _is_memory_sqlite(url):
+        return {}
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+engine = create_engine(DATABASE_URL, **_engine_kwargs(DATABASE_URL))
 SessionLocal = sessionmaker(bind=engine)
-Base.metadata.create_all(bind=engine)
+
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    ASYNC_DATABASE_URL = to_async_url(DATABASE_URL)
+    _async_kwargs = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if make_url(ASYNC_DATABASE_URL).get_backend_name() != "sqlite":
+        _async_kwargs.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **_async_kwargs)
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+def init_db():
+    Base.metadata.create_all(bind=engine)
+
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+get_session = get_async_db if DB_ASYNC else get_db
+
+
+async def dispose_async_engine():
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+def pool_stats() -> dict:
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            {
+                "size": pool.size(),
+                "max_overflow": DB_MAX_OVERFLOW,
+                "checked_in": pool.checkedin(),
+                "in_use": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+            }
+        )
+    stats.update(_wait_stats.snapshot())
+    if async_engine is not None:
+        stats["async_pool"] = async_engine.pool.status()
+    return stats
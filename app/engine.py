@@ -0,0 +1,394 @@
+import abc
+import hashlib
+import json
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.utils import murmurhash3_32
+
+ENGINE_FORMAT_VERSION = 1
+MMAP_FORMAT = "linear-text-mmap"
+MMAP_MANIFEST = "manifest.json"
+
+
+def sigmoid(z: float) -> float:
+    if z >= 0:
+        return 1.0 / (1.0 + math.exp(-z))
+    e = math.exp(z)
+    return e / (1.0 + e)
+
+
+# TF-IDF + binary logistic regression folded into a term -> (idf, idf * coef)
+# table: decision = sum(tf_t * idf_t * coef_t) / norm(tf * idf) + intercept.
+class LinearTextScorer:
+    def __init__(
+        self,
+        terms: dict[str, tuple[float, float]],
+        intercept: float,
+        token_pattern: str,
+        ngram_range: tuple[int, int] = (1, 1),
+        lowercase: bool = True,
+        norm: str | None = "l2",
+        sublinear_tf: bool = False,
+        binary: bool = False,
+        stop_words: frozenset[str] | None = None,
+        source: str = "",
+    ):
+        if norm not in ("l1", "l2", None):
+            raise ValueError(f"Unsupported norm: {norm}")
+        self.terms = terms
+        self.intercept = float(intercept)
+        self.token_pattern = token_pattern
+        self.ngram_range = tuple(ngram_range)
+        self.lowercase = lowercase
+        self.norm = norm
+        self.sublinear_tf = sublinear_tf
+        self.binary = binary
+        self.stop_words = stop_words
+        self.source = source
+        self.format_version = ENGINE_FORMAT_VERSION
+        self._token_re = re.compile(token_pattern)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_token_re", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._token_re = re.compile(self.token_pattern)
+
+    def analyze(self, text: str) -> list[str]:
+        if self.lowercase:
+            text = text.lower()
+        tokens = self._token_re.findall(text)
+        if self.stop_words is not None:
+            tokens = [w for w in tokens if w not in self.stop_words]
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+        grams = list(tokens) if min_n == 1 else []
+        n_tokens = len(tokens)
+        for n in range(max(min_n, 2), min(max_n + 1, n_tokens + 1)):
+            for i in range(n_tokens - n + 1):
+                grams.append(" ".join(tokens[i : i + n]))
+        return grams
+
+    def _tf(self, count: int) -> float:
+        if self.binary:
+            return 1.0
+        if self.sublinear_tf:
+            return 1.0 + math.log(count)
+        return float(count)
+
+    def contributions(self, text: str) -> list[tuple[str, float]]:
+        counts = Counter(t for t in self.analyze(text) if t in self.terms)
+        values = []
+        dot_norm = 0.0
+        for term, count in counts.items():
+            idf, weight = self.terms[term]
+            tf = self._tf(count)
+            values.append((term, tf * weight))
+            x = tf * idf
+            dot_norm += x * x if self.norm == "l2" else abs(x)
+        if self.norm is not None and dot_norm > 0:
+            scale = math.sqrt(dot_norm) if self.norm == "l2" else dot_norm
+            values = [(term, v / scale) for term, v in values]
+        return values
+
+    def decision(self, text: str) -> float:
+        terms = self.terms
+        counts: dict[str, int] = {}
+        for term in self.analyze(text):
+            if term in terms:
+                counts[term] = counts.get(term, 0) + 1
+        dot = 0.0
+        dot_norm = 0.0
+        l2 = self.norm == "l2"
+        for term, count in counts.items():
+            idf, weight = terms[term]
+            tf = self._tf(count) if self.binary or self.sublinear_tf else count
+            dot += tf * weight
+            x = tf * idf
+            dot_norm += x * x if l2 else abs(x)
+        if self.norm is not None and dot_norm > 0:
+            dot /= math.sqrt(dot_norm) if l2 else dot_norm
+        return dot + self.intercept
+
+    def score(self, text: str) -> float:
+        return sigmoid(self.decision(text))
+
+    def predict_proba(self, texts) -> np.ndarray:
+        p = np.fromiter((self.score(t) for t in texts), dtype=np.float64)
+        return np.column_stack([1.0 - p, p])
+
+    def predict(self, texts) -> np.ndarray:
+        return (self.predict_proba(texts)[:, 1] > 0.5).astype(int)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+
+@lru_cache(maxsize=1 << 16)
+def _term_hash(term: str) -> int:
+    digest = hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+# Shared scoring over aligned idf/weight arrays; subclasses map a text to
+# (labels, row indices, raw counts) via _match.
+class _ArrayLinearScorer(LinearTextScorer, abc.ABC):
+    idf: np.ndarray
+    weight: np.ndarray
+
+    @abc.abstractmethod
+    def _match(self, text: str) -> tuple[list[str], np.ndarray, np.ndarray]: ...
+
+    def _tf_array(self, counts: np.ndarray) -> np.ndarray:
+        if self.binary:
+            return np.ones_like(counts)
+        if self.sublinear_tf:
+            return 1.0 + np.log(counts)
+        return counts
+
+    def _scale(self, idx: np.ndarray, tf: np.ndarray) -> float:
+        if self.norm is None or not len(idx):
+            return 1.0
+        x = tf * self.idf[idx]
+        total = float(np.sqrt(x @ x)) if self.norm == "l2" else float(np.abs(x).sum())
+        return total if total > 0 else 1.0
+
+    def contributions(self, text: str) -> list[tuple[str, float]]:
+        labels, idx, counts = self._match(text)
+        tf = self._tf_array(counts)
+        values = tf * self.weight[idx] / self._scale(idx, tf)
+        return list(zip(labels, values.tolist()))
+
+    def decision(self, text: str) -> float:
+        _, idx, counts = self._match(text)
+        if not len(idx):
+            return self.intercept
+        tf = self._tf_array(counts)
+        return float(tf @ self.weight[idx]) / self._scale(idx, tf) + self.intercept
+
+
+# Column a gram lands in under HashingVectorizer(alternate_sign=False).
+@lru_cache(maxsize=1 << 16)
+def murmur_index(term: str, n_features: int) -> int:
+    return abs(int(murmurhash3_32(term, seed=0))) % n_features
+
+
+# HashingVectorizer(alternate_sign=False, norm=None) + TfidfTransformer + linear
+# classifier: grams hash straight into dense idf/weight arrays of n_features.
+class HashedLinearScorer(_ArrayLinearScorer):
+    def __init__(self, idf: np.ndarray, weight: np.ndarray, n_features: int, **kwargs):
+        super().__init__(terms={}, **kwargs)
+        self.idf = np.asarray(idf, dtype=np.float64)
+        self.weight = np.asarray(weight, dtype=np.float64)
+        self.n_features = int(n_features)
+
+    def _match(self, text: str):
+        n = self.n_features
+        counts: dict[int, int] = {}
+        labels: dict[int, str] = {}
+        for gram in self.analyze(text):
+            i = murmur_index(gram, n)
+            counts[i] = counts.get(i, 0) + 1
+            labels.setdefault(i, gram)
+        idx = np.fromiter(counts, dtype=np.int64, count=len(counts))
+        tf = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        return [labels[i] for i in counts], idx, tf
+
+    def __len__(self) -> int:
+        return self.n_features
+
+
+# Same scoring rule as LinearTextScorer, but the vocabulary is a sorted uint64
+# hash array with aligned idf/weight arrays, all np.load(mmap_mode="r"), so
+# every worker on a host shares the same page-cache pages.
+class MmapLinearScorer(_ArrayLinearScorer):
+    def __init__(self, path: Path, manifest: dict, arrays: dict[str, np.ndarray]):
+        super().__init__(
+            terms={},
+            intercept=manifest["intercept"],
+            token_pattern=manifest["token_pattern"],
+            ngram_range=tuple(manifest["ngram_range"]),
+            lowercase=manifest["lowercase"],
+            norm=manifest["norm"],
+            sublinear_tf=manifest["sublinear_tf"],
+            binary=manifest["binary"],
+            stop_words=(
+                frozenset(manifest["stop_words"]) if manifest["stop_words"] else None
+            ),
+            source=manifest.get("source", ""),
+        )
+        self.path = Path(path)
+        self.hashes = arrays["hashes"]
+        self.idf = arrays["idf"]
+        self.weight = arrays["weight"]
+        self.offsets = arrays["offsets"]
+        self.blob = arrays["terms"]
+
+    def __getstate__(self):
+        raise TypeError("MmapLinearScorer is loaded from disk, not pickled")
+
+    def _match(self, text: str):
+        counts = Counter(self.analyze(text))
+        if not counts or not len(self.hashes):
+            return [], np.empty(0, dtype=np.int64), np.empty(0)
+        grams = list(counts)
+        q = np.fromiter(
+            (_term_hash(g) for g in grams), dtype=np.uint64, count=len(grams)
+        )
+        idx = np.searchsorted(self.hashes, q)
+        idx[idx >= len(self.hashes)] = 0
+        hit = np.flatnonzero(self.hashes[idx] == q)
+        tf = np.fromiter((counts[grams[i]] for i in hit), dtype=np.float64)
+        return [grams[i] for i in hit], idx[hit], tf
+
+    def term_at(self, i: int) -> str:
+        return bytes(self.blob[self.offsets[i] : self.offsets[i + 1]]).decode("utf-8")
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+
+def save_mmap(scorer: LinearTextScorer, path: Path) -> Path:
+    if isinstance(scorer, _ArrayLinearScorer):
+        raise ValueError(f"{type(scorer).__name__} has no vocabulary to index")
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    items = sorted(
+        ((_term_hash(t), t, idf, w) for t, (idf, w) in scorer.terms.items()),
+        key=lambda r: r[0],
+    )
+    hashes = np.array([r[0] for r in items], dtype=np.uint64)
+    if len(hashes) > 1 and (np.diff(hashes) == 0).any():
+        raise ValueError("64-bit term hash collision; cannot build mmap index")
+    encoded = [r[1].encode("utf-8") for r in items]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+
+    arrays = {
+        "hashes": hashes,
+        "idf": np.array([r[2] for r in items], dtype=np.float64),
+        "weight": np.array([r[3] for r in items], dtype=np.float64),
+        "offsets": offsets,
+        "terms": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+    }
+    for name, arr in arrays.items():
+        np.save(path / f"{name}.npy", arr, allow_pickle=False)
+
+    manifest = {
+        "format": MMAP_FORMAT,
+        "format_version": ENGINE_FORMAT_VERSION,
+        "n_terms": len(items),
+        "intercept": scorer.intercept,
+        "token_pattern": scorer.token_pattern,
+        "ngram_range": list(scorer.ngram_range),
+        "lowercase": scorer.lowercase,
+        "norm": scorer.norm,
+        "sublinear_tf": scorer.sublinear_tf,
+        "binary": scorer.binary,
+        "stop_words": sorted(scorer.stop_words) if scorer.stop_words else None,
+        "source": scorer.source,
+    }
+    (path / MMAP_MANIFEST).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return path
+
+
+def is_mmap_artifact(path: Path) -> bool:
+    return Path(path).is_dir() and (Path(path) / MMAP_MANIFEST).exists()
+
+
+def load_mmap(path: Path) -> MmapLinearScorer:
+    path = Path(path)
+    manifest = json.loads((path / MMAP_MANIFEST).read_text(encoding="utf-8"))
+    if manifest.get("format") != MMAP_FORMAT:
+        raise ValueError(f"{path} is not a {MMAP_FORMAT} artifact")
+    if manifest.get("format_version") != ENGINE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported mmap format version in {path}")
+    arrays = {
+        name: np.asarray(
+            np.load(path / f"{name}.npy", mmap_mode="r", allow_pickle=False)
+        )
+        for name in ("hashes", "idf", "weight", "offsets", "terms")
+    }
+    return MmapLinearScorer(path, manifest, arrays)
+
+
+def load_artifact(path: Path):
+    if is_mmap_artifact(path):
+        return load_mmap(path)
+    return joblib.load(path)
+
+
+def _analyzer_kwargs(vec) -> dict:
+    if vec.analyzer != "word" or vec.tokenizer is not None:
+        raise ValueError("Only analyzer='word' with token_pattern is supported")
+    if vec.preprocessor is not None or vec.strip_accents is not None:
+        raise ValueError("Custom preprocessor/strip_accents are not supported")
+    stop = vec.get_stop_words()
+    return {
+        "token_pattern": vec.token_pattern,
+        "ngram_range": vec.ngram_range,
+        "lowercase": vec.lowercase,
+        "stop_words": frozenset(stop) if stop else None,
+    }
+
+
+def _compile_hashed(vec, tfidf, clf, source: str) -> HashedLinearScorer:
+    if vec.alternate_sign or vec.norm is not None:
+        raise ValueError("HashingVectorizer must use alternate_sign=False, norm=None")
+    coef = clf.coef_.ravel()
+    if coef.shape[0] != vec.n_features:
+        raise ValueError("Classifier width does not match HashingVectorizer")
+    idf = tfidf.idf_ if tfidf.use_idf else np.ones_like(coef)
+    return HashedLinearScorer(
+        idf=idf,
+        weight=idf * coef,
+        n_features=vec.n_features,
+        intercept=float(clf.intercept_[0]),
+        norm=tfidf.norm,
+        sublinear_tf=tfidf.sublinear_tf,
+        binary=vec.binary,
+        source=source,
+        **_analyzer_kwargs(vec),
+    )
+
+
+def compile_pipeline(pipe, source: str = "") -> LinearTextScorer:
+    steps = getattr(pipe, "named_steps", None)
+    if not steps or len(steps) not in (2, 3):
+        raise ValueError("Expected Pipeline(tfidf, clf) or Pipeline(hash, tfidf, clf)")
+    *features, clf = list(steps.values())
+    if not hasattr(clf, "coef_") or clf.coef_.shape[0] != 1:
+        raise ValueError("Expected a fitted binary linear classifier")
+
+    kinds = [type(step).__name__ for step in features]
+    if kinds == ["HashingVectorizer", "TfidfTransformer"]:
+        return _compile_hashed(*features, clf, source)
+    if kinds != ["TfidfVectorizer"]:
+        raise ValueError(f"Unsupported vectorizer: {'+'.join(kinds)}")
+    vec = features[0]
+
+    coef = clf.coef_.ravel()
+    idf = vec.idf_ if vec.use_idf else np.ones_like(coef)
+    terms = {
+        term: (float(idf[j]), float(idf[j] * coef[j]))
+        for term, j in vec.vocabulary_.items()
+    }
+    return LinearTextScorer(
+        terms=terms,
+        intercept=float(clf.intercept_[0]),
+        norm=vec.norm,
+        sublinear_tf=vec.sublinear_tf,
+        binary=vec.binary,
+        source=source,
+        **_analyzer_kwargs(vec),
+    )
@@ -0,0 +1,95 @@
+import numpy as np
+
+from app.engine import LinearTextScorer, murmur_index, sigmoid
+
+
+# The served model has no per-n-gram linear decomposition (mapped to 501).
+class ExplainUnsupported(Exception):
+    pass
+
+
+# Per-text explanation: (proba, n-gram labels, contributions to the decision).
+Explanation = tuple[float, list[str], np.ndarray]
+
+
+# Pipeline(TfidfVectorizer | HashingVectorizer+TfidfTransformer, linear clf):
+# contribution of an n-gram = its tf-idf value * coef_. The batch is vectorized
+# once and predict_proba runs on the same sparse rows, so explaining costs one
+# prediction plus a gather over the row's nonzeros.
+class PipelineExplainer:
+    def __init__(self, pipe):
+        self.features = pipe[:-1]
+        self.clf = pipe[-1]
+        self.coef = np.asarray(self.clf.coef_, dtype=np.float64).ravel()
+        self.intercept = float(self.clf.intercept_[0])
+        vec = pipe[0]
+        if hasattr(vec, "vocabulary_"):
+            self.names = vec.get_feature_names_out()
+            self.analyzer = None
+        else:
+            # Hashed features have no vocabulary: recover the n-grams of each
+            # text by re-hashing its analyzer output.
+            self.names = None
+            self.analyzer = vec.build_analyzer()
+            self.n_features = vec.n_features
+
+    def _labels(self, text: str, idx: np.ndarray) -> list[str]:
+        if self.names is not None:
+            return self.names[idx].tolist()
+        grams: dict[int, list[str]] = {}
+        for gram in dict.fromkeys(self.analyzer(text)):
+            grams.setdefault(murmur_index(gram, self.n_features), []).append(gram)
+        return [" | ".join(grams.get(int(i), [f"#{i}"])) for i in idx]
+
+    def explain_many(self, texts: list[str]) -> list[Explanation]:
+        X = self.features.transform(texts).tocsr()
+        probas = self.clf.predict_proba(X)[:, 1]
+        out = []
+        for i, text in enumerate(texts):
+            start, end = X.indptr[i], X.indptr[i + 1]
+            idx = X.indices[start:end]
+            values = X.data[start:end] * self.coef[idx]
+            out.append((float(probas[i]), self._labels(text, idx), values))
+        return out
+
+
+class CompiledExplainer:
+    def __init__(self, scorer: LinearTextScorer):
+        self.scorer = scorer
+        self.intercept = scorer.intercept
+
+    def explain_many(self, texts: list[str]) -> list[Explanation]:
+        out = []
+        for text in texts:
+            pairs = self.scorer.contributions(text)
+            values = np.fromiter((v for _, v in pairs), dtype=np.float64)
+            proba = sigmoid(float(values.sum()) + self.intercept)
+            out.append((proba, [t for t, _ in pairs], values))
+        return out
+
+
+def build_explainer(model):
+    if isinstance(model, LinearTextScorer):
+        return CompiledExplainer(model)
+    steps = getattr(model, "named_steps", None)
+    if not steps:
+        return None
+    clf = model[-1]
+    if getattr(clf, "coef_", None) is None or clf.coef_.shape[0] != 1:
+        return None
+    if not hasattr(model[0], "vocabulary_") and not hasattr(model[0], "n_features"):
+        return None
+    return PipelineExplainer(model)
+
+
+def top_contributions(
+    labels: list[str], values: np.ndarray, k: int
+) -> tuple[list[dict], list[dict]]:
+    order = np.argsort(values, kind="stable")
+    neg = [i for i in order[:k] if values[i] < 0]
+    pos = [i for i in order[::-1][:k] if values[i] > 0]
+
+    def _items(ids):
+        return [{"ngram": labels[i], "contribution": float(values[i])} for i in ids]
+
+    return _items(pos), _items(neg)
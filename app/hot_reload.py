@@ -0,0 +1,96 @@
+import os
+import threading
+from pathlib import Path
+from typing import Callable
+
+from app.utils import logger
+
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "0"))
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+# Longest wait between retries of a version that failed to load, in ticks.
+MAX_RETRY_TICKS = 64
+
+
+class MetadataWatcher:
+    def __init__(self, path: Path, interval: float, on_change: Callable[[], object]):
+        self.path = Path(path)
+        self.interval = interval
+        self._on_change = on_change
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._last = None
+        self._failed = None
+        self._streak = 0
+        self._skip = 0
+        self.reloads = 0
+        self.failures = 0
+        self.last_error: str | None = None
+
+    def _signature(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def start(self):
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._last = self._signature()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="model-watcher", daemon=True
+        )
+        self._thread.start()
+        logger.info("Watching %s every %.1fs", self.path, self.interval)
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(self.interval + 1)
+        self._thread = None
+
+    def check(self) -> bool:
+        sig = self._signature()
+        if sig is None or sig == self._last:
+            return False
+        if sig == self._failed and self._skip:
+            self._skip -= 1
+            return False
+        try:
+            self._on_change()
+        except Exception as e:
+            # _last stays on the previous version, so this one is retried
+            # (e.g. metadata written before its model file): next tick first,
+            # then after 1, 3, 7, ... skipped ticks. Traceback once per version.
+            self.failures += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            if sig != self._failed:
+                self._failed, self._streak = sig, 0
+                logger.exception("Hot reload from %s failed: %s", self.path, e)
+            else:
+                logger.debug("Hot reload retry failed: %s", e)
+            self._skip = min(2**self._streak - 1, MAX_RETRY_TICKS)
+            self._streak += 1
+            return False
+        self._last = sig
+        self._failed, self._streak, self._skip = None, 0, 0
+        self.last_error = None
+        self.reloads += 1
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self._thread is not None,
+            "interval_sec": self.interval,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "failing": self._failed is not None,
+            "consecutive_failures": self._streak,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,100 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_QUEUE = os.getenv("LOG_QUEUE", "0").lower() in ("1", "true", "yes")
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s - %(message)s"
+
+logger = logging.getLogger("toxicity-api")
+request_logger = logging.getLogger("toxicity-api.request")
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            out.update(fields)
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        return json.dumps(out, ensure_ascii=False, default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    # Stock prepare() formats the message in the calling thread; records stay
+    # in-process, so hand them over as is and let the listener format them.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _KeyValues:
+    # Rendered only if a handler actually formats the record.
+    __slots__ = ("fields",)
+
+    def __init__(self, fields: dict):
+        self.fields = fields
+
+    def __str__(self) -> str:
+        return " ".join(f"{k}={v}" for k, v in self.fields.items())
+
+
+def setup_logging(
+    level: str = LOG_LEVEL, fmt: str = LOG_FORMAT, use_queue: bool = LOG_QUEUE
+) -> QueueListener | None:
+    root = logging.getLogger()
+    if root.handlers:
+        # Already configured by the host (uvicorn --log-config, pytest, ...),
+        # same as logging.basicConfig.
+        return None
+
+    stream = logging.StreamHandler()
+    stream.setFormatter(
+        JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT)
+    )
+    if not use_queue:
+        logging.basicConfig(level=level, handlers=[stream])
+        return None
+
+    # Request threads only enqueue; formatting and the blocking stderr write
+    # happen on the listener thread.
+    q: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(q, stream, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    logging.basicConfig(level=level, handlers=[_DeferredQueueHandler(q)])
+    return listener
+
+
+def sample_request() -> bool:
+    # Level check and sampling draw, before any field is computed or formatted.
+    if not request_logger.isEnabledFor(logging.INFO):
+        return False
+    return LOG_SAMPLE_RATE >= 1.0 or random.random() < LOG_SAMPLE_RATE
+
+
+def log_request(event: str, **fields):
+    # One INFO record per request; call sites guard it with sample_request().
+    if LOG_SAMPLE_RATE < 1.0:
+        fields["sample_rate"] = LOG_SAMPLE_RATE
+    request_logger.info(
+        "%s %s", event, _KeyValues(fields), extra={"fields": {"event": event, **fields}}
+    )
+
+
+listener = setup_logging()
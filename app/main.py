@@ -1,18 +1,58 @@
-import csv
+import asyncio
 import os
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
-from app.schemas import HealthOut, PredictIn, PredictOut, FeedbackIn, FeedbackOut
-from app.predict import predict_one, load_model, MODEL_VERSION
+from app.schemas import (
+    HealthOut,
+    PredictIn,
+    PredictOut,
+    PredictBatchIn,
+    PredictBatchOut,
+    ExplainIn,
+    ExplainOut,
+    ExplainBatchIn,
+    ExplainBatchOut,
+    FeedbackIn,
+    FeedbackOut,
+    ReloadOut,
+)
+from app.predict import (
+    predict_one,
+    predict_batch,
+    explain_one,
+    explain_batch,
+    load_model,
+    reload_model,
+    current_state,
+    get_model_version,
+    cache_stats,
+    shared_cache_stats,
+    _METADATA_PATH,
+)
+from app.hot_reload import ADMIN_TOKEN, MODEL_WATCH_INTERVAL, MetadataWatcher
+from app import metrics
+from app.explain import ExplainUnsupported
+from app.batching import BATCH_TIMEOUT_S, BATCHING_ENABLED, MicroBatcher
+from app.persistence import PredictionWriter
+from app.logs import log_request, sample_request
 from app.utils import logger
-from app.db import SessionLocal
-from app.db_models import Feedback, Prediction
+from app.db import (
+    DB_ASYNC,
+    dispose_async_engine,
+    get_session,
+    init_db,
+    pool_stats,
+)
+from app.db_models import Feedback
 
 ALLOWED_ORIGINS = os.getenv("CORS_ORIGIN", "*").split(",")
+INFER_WORKERS = int(os.getenv("INFER_WORKERS", str(min(4, os.cpu_count() or 1))))
 
 app = FastAPI(
     title="Toxicity API",
@@ -31,59 +71,214 @@ app.add_middleware(
 FEED = Path("data/feedback.csv")
 FEED.parent.mkdir(parents=True, exist_ok=True)
 
+_batcher = MicroBatcher(predict_batch) if BATCHING_ENABLED else None
+_writer = PredictionWriter()
+_watcher = MetadataWatcher(_METADATA_PATH, MODEL_WATCH_INTERVAL, reload_model)
+_infer_executor = ThreadPoolExecutor(
+    max_workers=max(1, INFER_WORKERS), thread_name_prefix="infer"
+)
+
+
+async def _run_inference(fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_infer_executor, fn, *args)
+
 
 @app.on_event("startup")
 def _startup():
+    init_db()
     try:
         load_model()
         logger.info("Startup: model ready")
     except Exception as e:
         logger.exception("Startup model load failed: %s", e)
+    _watcher.start()
+    if _batcher is not None:
+        _batcher.start()
+    _writer.start()
+
+
+@app.on_event("shutdown")
+async def _shutdown():
+    _watcher.stop()
+    if _batcher is not None:
+        _batcher.stop()
+    await run_in_threadpool(_writer.stop)
+    _infer_executor.shutdown(wait=False)
+    await dispose_async_engine()
 
 
 @app.get("/health", response_model=HealthOut, tags=["meta"])
 def health():
-    return {"status": "ok", "model_version": MODEL_VERSION}
+    return {"status": "ok", "model_version": get_model_version()}
+
+
+@app.post("/admin/reload", response_model=ReloadOut, tags=["meta"])
+async def admin_reload(x_admin_token: str | None = Header(default=None)):
+    if ADMIN_TOKEN and x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="forbidden")
+    try:
+        state = await run_in_threadpool(reload_model)
+    except Exception as e:
+        logger.exception("Model reload failed: %s", e)
+        raise HTTPException(status_code=500, detail="reload failed")
+    return {"status": "reloaded", "model_version": state.version}
+
+
+def _model_stats() -> dict:
+    try:
+        state = current_state()
+    except Exception:
+        return {"loaded": False, "watcher": _watcher.stats()}
+    return {
+        "loaded": True,
+        "version": state.version,
+        "model_file": state.model_file,
+        "vectorizer": state.meta.get("vectorizer", "tfidf"),
+        "threshold": state.threshold,
+        "apply_clean": state.apply_clean,
+        "watcher": _watcher.stats(),
+    }
+
+
+@app.get("/stats", tags=["meta"])
+def stats():
+    return {
+        "model": _model_stats(),
+        "batching": _batcher.stats() if _batcher is not None else {"enabled": False},
+        "prediction_cache": cache_stats(),
+        "shared_cache": shared_cache_stats(),
+        "persistence": _writer.stats(),
+        "db_pool": pool_stats(),
+        "inference": {"workers": INFER_WORKERS, "db_async": DB_ASYNC},
+    }
+
+
+@app.get("/metrics", tags=["meta"])
+def metrics_endpoint():
+    if not metrics.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="metrics disabled")
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
 
 
 @app.post("/predict", response_model=PredictOut, tags=["inference"])
-def predict(payload: PredictIn):
-    db = SessionLocal()
+async def predict(payload: PredictIn):
+    t0 = time.perf_counter()
     try:
-        result = predict_one(payload.text)
-        prediction = Prediction(
-            text=payload.text,
-            pred_label=result["label"],
-            prob=result["prob"],
-        )
-        db.add(prediction)
-        db.commit()
-        logger.info(
-            "predict len=%d label=%s prob=%.3f low_conf=%s",
-            len(payload.text),
-            result["label"],
-            result["prob"],
-            result["low_confidence"],
-        )
+        with metrics.handler_timer():
+            if _batcher is not None:
+                result = await asyncio.wait_for(
+                    asyncio.wrap_future(_batcher.submit(payload.text)),
+                    BATCH_TIMEOUT_S,
+                )
+            else:
+                result = await _run_inference(predict_one, payload.text)
+            with metrics.timed("persist"):
+                await _writer.arecord(
+                    [
+                        {
+                            "text": payload.text,
+                            "pred_label": result["label"],
+                            "prob": result["prob"],
+                        }
+                    ]
+                )
+        metrics.count_predictions("predict", [result])
+        if sample_request():
+            log_request(
+                "predict",
+                len=len(payload.text),
+                label=result["label"],
+                prob=round(result["prob"], 3),
+                low_conf=result["low_confidence"],
+                ms=round((time.perf_counter() - t0) * 1000, 2),
+            )
         return result
+    except asyncio.TimeoutError:
+        logger.warning("Batched predict timed out after %.1fs", BATCH_TIMEOUT_S)
+        raise HTTPException(status_code=503, detail="inference timeout")
     except Exception as e:
         logger.exception("Predcit failed: %s", e)
         raise HTTPException(status_code=500, detail="internal error")
 
 
+@app.post("/predict/batch", response_model=PredictBatchOut, tags=["inference"])
+async def predict_many(payload: PredictBatchIn):
+    t0 = time.perf_counter()
+    try:
+        with metrics.handler_timer():
+            results = await _run_inference(predict_batch, payload.texts)
+            with metrics.timed("persist", "batch"):
+                await _writer.arecord(
+                    [
+                        {"text": text, "pred_label": r["label"], "prob": r["prob"]}
+                        for text, r in zip(payload.texts, results)
+                    ]
+                )
+        metrics.count_predictions("predict_batch", results)
+        if sample_request():
+            log_request(
+                "predict_batch",
+                n=len(results),
+                toxic=sum(r["label"] == "toxic" for r in results),
+                low_conf=sum(r["low_confidence"] for r in results),
+                ms=round((time.perf_counter() - t0) * 1000, 2),
+            )
+        return {"items": results}
+    except Exception as e:
+        logger.exception("Predict batch failed: %s", e)
+        raise HTTPException(status_code=500, detail="internal error")
+
+
+@app.post("/explain", response_model=ExplainOut, tags=["inference"])
+async def explain(payload: ExplainIn):
+    try:
+        return await _run_inference(explain_one, payload.text, payload.top_k)
+    except ExplainUnsupported as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        logger.exception("Explain failed: %s", e)
+        raise HTTPException(status_code=500, detail="internal error")
+
+
+@app.post("/explain/batch", response_model=ExplainBatchOut, tags=["inference"])
+async def explain_many(payload: ExplainBatchIn):
+    try:
+        items = await _run_inference(explain_batch, payload.texts, payload.top_k)
+        return {"items": items}
+    except ExplainUnsupported as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception as e:
+        logger.exception("Explain batch failed: %s", e)
+        raise HTTPException(status_code=500, detail="internal error")
+
+
+def _commit_and_refresh(db, obj):
+    db.add(obj)
+    db.commit()
+    db.refresh(obj)
+
+
 @app.post("/feedback", response_model=FeedbackOut, tags=["feedback"])
-def feedback(item: FeedbackIn):
-    db = SessionLocal()
+async def feedback(item: FeedbackIn, db=Depends(get_session)):
     try:
         f = Feedback(text=item.text, pred_label="?", true_label=item.true_label)
-        db.add(f)
-        db.commit()
-        db.refresh(f)
+        if DB_ASYNC:
+            db.add(f)
+            await db.commit()
+            await db.refresh(f)
+        else:
+            await run_in_threadpool(_commit_and_refresh, db, f)
         logger.info("feedback saved id=%d", f.id)
         return {"status": "stored"}
     except Exception as e:
-        db.rollback()
+        if DB_ASYNC:
+            await db.rollback()
+        else:
+            await run_in_threadpool(db.rollback)
         logger.exception("DB feedback failed: %s", e)
         raise HTTPException(status_code=500, detail="db error")
-    finally:
-        db.close()
+
+
+# Outermost, so request latency covers CORS, routing and validation too.
+app.add_middleware(metrics.MetricsMiddleware, paths={r.path for r in app.routes})
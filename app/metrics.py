@@ -0,0 +1,270 @@
+import bisect
+import contextlib
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").lower() in ("1", "true", "yes")
+
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+# Minimal Prometheus client: label values are passed positionally as a tuple in
+# labelnames order, one lock per metric, text exposition format 0.0.4.
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), registry=None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: dict[tuple, object] = {}
+        (REGISTRY if registry is None else registry).append(self)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+            lines += self._samples(items)
+        return lines
+
+    def _samples(self, items) -> list[str]:
+        return [
+            f"{self.name}{_labels(self.labelnames, key)} {value}"
+            for key, value in items
+        ]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, labels: tuple = (), value: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + value
+
+    def value(self, labels: tuple = ()) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, labels: tuple = ()):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name, help, labelnames=(), buckets=LATENCY_BUCKETS, registry=None
+    ):
+        super().__init__(name, help, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: tuple = ()):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][i] += 1
+            state[1] += value
+
+    def count(self, labels: tuple = ()) -> int:
+        with self._lock:
+            state = self._values.get(labels)
+            return sum(state[0]) if state else 0
+
+    def _samples(self, items) -> list[str]:
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _labels(self.labelnames, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {total}")
+            lines.append(
+                f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}"
+            )
+        return lines
+
+
+REGISTRY: list[_Metric] = []
+
+STAGE_SECONDS = Histogram(
+    "toxicity_stage_seconds",
+    "Time spent per inference stage.",
+    ("stage", "mode"),
+)
+REQUEST_SECONDS = Histogram(
+    "toxicity_http_request_seconds",
+    "HTTP request latency.",
+    ("method", "path", "status"),
+)
+PREDICTIONS = Counter(
+    "toxicity_predictions_total",
+    "Predictions served, by endpoint, label and low_confidence.",
+    ("endpoint", "label", "low_confidence"),
+)
+DB_WRITE_SECONDS = Histogram(
+    "toxicity_db_write_seconds",
+    "Prediction insert + commit latency.",
+    ("writer",),
+)
+DB_ROWS = Counter(
+    "toxicity_db_rows_written_total", "Prediction rows written.", ("writer",)
+)
+MODEL_INFO = Gauge(
+    "toxicity_model_info",
+    "Currently served model (value is always 1).",
+    ("version", "vectorizer", "model_file"),
+)
+MODEL_THRESHOLD = Gauge("toxicity_model_threshold", "Decision threshold in use.")
+MODEL_LOADED = Gauge(
+    "toxicity_model_loaded_timestamp_seconds", "Unix time the model was swapped in."
+)
+
+_NOOP = contextlib.nullcontext()
+# Per-request accumulator of handler time, set by MetricsMiddleware; whatever is
+# left of the request is routing, pydantic validation and serialization.
+_handler_seconds: ContextVar[list | None] = ContextVar("handler_seconds", default=None)
+
+
+class _Timer:
+    __slots__ = ("labels", "t0")
+
+    def __init__(self, labels: tuple):
+        self.labels = labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        STAGE_SECONDS.observe(time.perf_counter() - self.t0, self.labels)
+
+
+class _HandlerTimer(_Timer):
+    __slots__ = ()
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.t0
+        holder = _handler_seconds.get()
+        if holder is not None:
+            holder[0] += elapsed
+
+
+def timed(stage: str, mode: str = "one"):
+    return _Timer((stage, mode)) if METRICS_ENABLED else _NOOP
+
+
+def handler_timer():
+    return _HandlerTimer(()) if METRICS_ENABLED else _NOOP
+
+
+def count_predictions(endpoint: str, results: list[dict]):
+    if not METRICS_ENABLED:
+        return
+    for r in results:
+        PREDICTIONS.inc((endpoint, r["label"], str(bool(r["low_confidence"])).lower()))
+
+
+def observe_db_write(writer: str, seconds: float, rows: int):
+    if not METRICS_ENABLED:
+        return
+    DB_WRITE_SECONDS.observe(seconds, (writer,))
+    DB_ROWS.inc((writer,), rows)
+
+
+def set_model(version: str, vectorizer: str, model_file: str, threshold: float):
+    if not METRICS_ENABLED:
+        return
+    MODEL_INFO.clear()
+    MODEL_INFO.set(1, (version, vectorizer, model_file))
+    MODEL_THRESHOLD.set(threshold)
+    MODEL_LOADED.set(time.time())
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    # Plain ASGI middleware (no BaseHTTPMiddleware task hop); unknown paths are
+    # collapsed to "other" to keep label cardinality bounded.
+    def __init__(self, app, paths: set[str] | None = None):
+        self.app = app
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        holder = [0.0]
+        token = _handler_seconds.set(holder)
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            total = time.perf_counter() - t0
+            _handler_seconds.reset(token)
+            path = scope["path"]
+            if self.paths is not None and path not in self.paths:
+                path = "other"
+            REQUEST_SECONDS.observe(total, (scope["method"], path, str(status[0])))
+            if holder[0]:
+                STAGE_SECONDS.observe(
+                    max(total - holder[0], 0.0), ("framework", "http")
+                )
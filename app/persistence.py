@@ -0,0 +1,208 @@
+import os
+import queue
+import threading
+import time
+from typing import Callable
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app import metrics
+from app.db import AsyncSessionLocal, SessionLocal
+from app.db_models import Prediction
+from app.utils import logger
+
+PERSIST_MODES = ("sync", "async", "off")
+PERSIST_MODE = os.getenv("PREDICTION_PERSIST", "sync").lower()
+PERSIST_BATCH_SIZE = int(os.getenv("PERSIST_BATCH_SIZE", "500"))
+PERSIST_FLUSH_INTERVAL = float(os.getenv("PERSIST_FLUSH_INTERVAL", "1.0"))
+PERSIST_QUEUE_SIZE = int(os.getenv("PERSIST_QUEUE_SIZE", "10000"))
+PERSIST_PUT_TIMEOUT = float(os.getenv("PERSIST_PUT_TIMEOUT", "0.05"))
+
+_STOP = object()
+
+
+def insert_predictions(
+    session_factory: Callable[[], Session], rows: list[dict], writer: str = "sync"
+):
+    if not rows:
+        return
+    t0 = time.perf_counter()
+    with session_factory() as db:
+        db.execute(insert(Prediction), rows)
+        db.commit()
+    metrics.observe_db_write(writer, time.perf_counter() - t0, len(rows))
+
+
+class PredictionWriter:
+    def __init__(
+        self,
+        mode: str = PERSIST_MODE,
+        session_factory: Callable[[], Session] = SessionLocal,
+        async_session_factory=AsyncSessionLocal,
+        batch_size: int = PERSIST_BATCH_SIZE,
+        flush_interval: float = PERSIST_FLUSH_INTERVAL,
+        queue_size: int = PERSIST_QUEUE_SIZE,
+        put_timeout: float = PERSIST_PUT_TIMEOUT,
+    ):
+        if mode not in PERSIST_MODES:
+            raise ValueError(f"PREDICTION_PERSIST must be one of {PERSIST_MODES}")
+        self.mode = mode
+        self._session_factory = session_factory
+        self._async_session_factory = async_session_factory
+        self._batch_size = max(1, batch_size)
+        self._flush_interval = flush_interval
+        self._put_timeout = put_timeout
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self._thread: threading.Thread | None = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+
+    def start(self):
+        if self.mode != "async":
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="prediction-writer", daemon=True
+            )
+            self._thread.start()
+        logger.info(
+            "Prediction writer started batch_size=%d flush_interval=%.2fs",
+            self._batch_size,
+            self._flush_interval,
+        )
+
+    def stop(self, timeout: float = 10.0):
+        thread = self._thread
+        if thread is None:
+            return
+        # The flag alone stops the worker after its current flush; the marker
+        # only wakes it up early and is skipped when the queue is full (slow or
+        # unreachable DB), so shutdown never blocks past the timeout.
+        self._stopping.set()
+        deadline = time.monotonic() + timeout
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("Prediction queue full on stop, not waiting for a slot")
+        thread.join(max(deadline - time.monotonic(), 0.0))
+        if thread.is_alive():
+            logger.warning("Prediction writer still flushing after %.1fs", timeout)
+        self._thread = None
+        logger.info(
+            "Prediction writer stopped written=%d dropped=%d failed=%d",
+            self.written,
+            self.dropped,
+            self.failed,
+        )
+
+    def record(self, rows: list[dict]):
+        if self.mode == "off" or not rows:
+            return
+        if self.mode == "sync":
+            insert_predictions(self._session_factory, rows)
+            with self._lock:
+                self.written += len(rows)
+            return
+
+        if self._thread is None:
+            self.start()
+        for i, row in enumerate(rows):
+            try:
+                self._queue.put(row, timeout=self._put_timeout)
+            except queue.Full:
+                with self._lock:
+                    self.dropped += len(rows) - i
+                logger.warning("Prediction queue full, dropped %d rows", len(rows) - i)
+                return
+
+    async def arecord(self, rows: list[dict]):
+        if self.mode == "off" or not rows:
+            return
+        if self.mode == "async":
+            if self._thread is None:
+                self.start()
+            # Enqueue inline while there is room; only a full queue pays the
+            # threadpool hop for the put that waits up to PERSIST_PUT_TIMEOUT.
+            for i, row in enumerate(rows):
+                try:
+                    self._queue.put_nowait(row)
+                except queue.Full:
+                    await run_in_threadpool(self.record, rows[i:])
+                    return
+            return
+        if self._async_session_factory is None:
+            await run_in_threadpool(self.record, rows)
+            return
+        t0 = time.perf_counter()
+        async with self._async_session_factory() as db:
+            await db.execute(insert(Prediction), rows)
+            await db.commit()
+        metrics.observe_db_write("asyncio", time.perf_counter() - t0, len(rows))
+        with self._lock:
+            self.written += len(rows)
+
+    def _run(self):
+        stopping = False
+        while not stopping and not self._stopping.is_set():
+            batch = []
+            deadline = time.monotonic() + self._flush_interval
+            while len(batch) < self._batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        item = self._queue.get(timeout=remaining)
+                    else:
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+
+        leftover = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftover.append(item)
+        for start in range(0, len(leftover), self._batch_size):
+            self._flush(leftover[start : start + self._batch_size])
+
+    def _flush(self, batch: list[dict]):
+        if not batch:
+            return
+        try:
+            insert_predictions(self._session_factory, batch, writer="background")
+        except Exception as e:
+            logger.exception("Prediction flush failed (n=%d): %s", len(batch), e)
+            with self._lock:
+                self.failed += len(batch)
+            return
+        with self._lock:
+            self.written += len(batch)
+            self.flushes += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "flushes": self.flushes,
+            }
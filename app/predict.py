@@ -1,8 +1,26 @@
+import hashlib
 import json
+import logging
 import os
+import sqlite3
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-import joblib
-from app.utils import clean_text, logger
+from typing import Any
+
+from app import metrics
+from app.engine import compile_pipeline, load_artifact
+from app.explain import ExplainUnsupported, build_explainer, top_contributions
+from app.cache import PRED_CACHE_SIZE, PRED_CACHE_TTL, LRUCache
+from app.shared_cache import SHARED_CACHE_PATH, SHARED_CACHE_SIZE, SharedCache
+from app.utils import (
+    clean_text,
+    hash_group,
+    has_markup_or_emoji,
+    normalize_ws,
+    logger,
+    uses_clean,
+)
 
 MODELS = Path("models")
 _METADATA_PATH = MODELS / "metadata.json"
@@ -10,33 +28,37 @@ _METADATA_PATH = MODELS / "metadata.json"
 THRESHOLD = float(os.getenv("THRESHOLD", "0.6"))
 LOW_CONF_FLOOR = float(os.getenv("LOW_CONF_FLOOR", "0.65"))
 SHORT_LEN = int(os.getenv("SHORT_LEN", "8"))
+MODEL_ENGINE = os.getenv("MODEL_ENGINE", "auto").lower()
 
-_model = None
-_model_meta = {}
-MODEL_VERSION = "v1"
-_APPLY_CLEAN = None
-_MODEL_THRESHOLD = THRESHOLD
 
+@dataclass(frozen=True)
+class ModelState:
+    model: Any
+    version: str
+    threshold: float
+    apply_clean: bool
+    meta: dict = field(default_factory=dict)
+    model_file: str = ""
+    explainer: Any = None
+    # Identity of the loaded artifact for cache keys; version alone is minute
+    # resolution and two runs in the same minute reuse the file name.
+    model_id: str = ""
 
-def load_model():
-    global _model, MODEL_VERSION, _model_meta, _APPLY_CLEAN, _MODEL_THRESHOLD
-    meta = json.load(open(_METADATA_PATH, encoding="utf-8"))
-    _model_meta = meta
-    MODEL_VERSION = meta.get("created", meta.get("created_at", "v1"))
 
-    if "threshold" in meta:
-        _MODEL_THRESHOLD = float(meta["threshold"])
-    else:
-        _MODEL_THRESHOLD = THRESHOLD
+_state: ModelState | None = None
+_load_lock = threading.Lock()
+MODEL_VERSION = "v1"
+
+_cache = LRUCache(PRED_CACHE_SIZE, PRED_CACHE_TTL) if PRED_CACHE_SIZE > 0 else None
+_shared_cache = None
+if SHARED_CACHE_PATH:
+    try:
+        _shared_cache = SharedCache(SHARED_CACHE_PATH, SHARED_CACHE_SIZE)
+    except sqlite3.Error as e:
+        logger.exception("Shared cache disabled (%s): %s", SHARED_CACHE_PATH, e)
 
-    notes = str(meta.get("notes", "")).lower()
-    preprocess = meta.get("preprocess", {})
-    if isinstance(preprocess, dict):
-        _APPLY_CLEAN = bool(preprocess.get("clean_text", "clean_text" in notes))
-    else:
-        _APPLY_CLEAN = "clean_text" in notes
 
-    raw_model_path = str(meta["model_file"])
+def _resolve_model_file(raw_model_path: str) -> Path:
     model_file = Path(raw_model_path)
     if not model_file.exists():
         norm = Path(raw_model_path.replace("\\", "/"))
@@ -66,61 +88,294 @@ def load_model():
             MODELS,
         )
         raise FileNotFoundError(f"Model file not found: {raw_model_path}")
+    return model_file
 
-    logger.info("Loading model_file=%s meta=%s", model_file, meta)
-    _model = joblib.load(model_file)
-    logger.info("Model loaded type=%s", type(_model))
-    logger.info("Model threshold=%s apply_clean=%s", _MODEL_THRESHOLD, _APPLY_CLEAN)
 
-    try:
-        sample = "you are idiot"
-        input_for_model = clean_text(sample) if _APPLY_CLEAN else sample
-        if hasattr(_model, "predict_proba"):
-            p = float(_model.predict_proba([input_for_model])[0][1])
-        else:
-            p = float(_model.predict([input_for_model])[0])
-        logger.info(
-            "Smoke test sample='%s' -> prob=%.4f (applied_clean=%s)",
-            sample,
-            p,
-            _APPLY_CLEAN,
-        )
-    except Exception as e:
-        logger.exception("Smoke test failed: %s", e)
+def _model_identity(model_file: Path) -> str:
+    # Resolved path + size + mtime of the artifact (each file of an mmap dir).
+    path = model_file.resolve()
+    h = hashlib.sha1(str(path).encode("utf-8"))
+    for f in sorted(path.rglob("*")) if path.is_dir() else [path]:
+        if f.is_file():
+            st = f.stat()
+            h.update(f"|{f.name}:{st.st_size}:{st.st_mtime_ns}".encode("utf-8"))
+    return h.hexdigest()[:16]
 
 
-def predict_one(text: str):
-    if _model is None:
-        load_model()
+def _smoke_test(state: ModelState):
+    sample = "you are idiot"
+    input_for_model = clean_text(sample) if state.apply_clean else sample
+    if hasattr(state.model, "predict_proba"):
+        p = float(state.model.predict_proba([input_for_model])[0][1])
+    else:
+        p = float(state.model.predict([input_for_model])[0])
+    if not 0.0 <= p <= 1.0:
+        raise ValueError(f"Smoke test probability out of range: {p}")
+    logger.info(
+        "Smoke test sample='%s' -> prob=%.4f (applied_clean=%s)",
+        sample,
+        p,
+        state.apply_clean,
+    )
+
 
-    raw = text
-    cleaned = clean_text(text)
+def _build_state() -> ModelState:
+    meta = json.load(open(_METADATA_PATH, encoding="utf-8"))
+    version = meta.get("created", meta.get("created_at", "v1"))
 
-    if _APPLY_CLEAN is not None:
-        use_clean = _APPLY_CLEAN
+    if "threshold" in meta:
+        threshold = float(meta["threshold"])
     else:
-        use_clean = not hasattr(_model, "named_steps")
+        threshold = THRESHOLD
 
-    input_text = cleaned if use_clean else raw
+    apply_clean = uses_clean(meta)
 
-    logger.debug(
-        "Predicting (len=%d) use_clean=%s input=%s",
-        len(text),
-        use_clean,
-        input_text[:200],
+    engine_file = meta.get("mmap_dir") or meta.get("engine_file")
+    if MODEL_ENGINE != "sklearn" and engine_file:
+        model_file = _resolve_model_file(str(engine_file))
+    else:
+        model_file = _resolve_model_file(str(meta["model_file"]))
+
+    logger.info("Loading model_file=%s meta=%s", model_file, meta)
+    model = load_artifact(model_file)
+    if MODEL_ENGINE == "compiled" and hasattr(model, "named_steps"):
+        model = compile_pipeline(model, source=str(model_file))
+    logger.info(
+        "Model loaded type=%s vectorizer=%s",
+        type(model),
+        meta.get("vectorizer", "tfidf"),
+    )
+    logger.info("Model threshold=%s apply_clean=%s", threshold, apply_clean)
+    # coef_ / feature names are gathered once here, not per /explain call.
+    explainer = build_explainer(model)
+    if explainer is None:
+        logger.warning("No linear explainer for model type=%s", type(model))
+    return ModelState(
+        model=model,
+        version=version,
+        threshold=threshold,
+        apply_clean=apply_clean,
+        meta=meta,
+        model_file=str(model_file),
+        explainer=explainer,
+        model_id=_model_identity(model_file),
     )
 
-    proba = float(_model.predict_proba([input_text])[0][1])
-    label = "toxic" if proba >= _MODEL_THRESHOLD else "clean"
-    low_confidence = (proba < max(_MODEL_THRESHOLD, LOW_CONF_FLOOR)) or (
-        len(cleaned) < SHORT_LEN
+
+def _swap(state: ModelState):
+    global _state, MODEL_VERSION
+    _state = state
+    MODEL_VERSION = state.version
+    metrics.set_model(
+        state.version,
+        state.meta.get("vectorizer", "tfidf"),
+        state.model_file,
+        state.threshold,
     )
+    if _cache is not None:
+        _cache.clear()
+
+
+def load_model():
+    with _load_lock:
+        state = _build_state()
+        try:
+            _smoke_test(state)
+        except Exception as e:
+            logger.exception("Smoke test failed: %s", e)
+        _swap(state)
+
 
+def reload_model() -> ModelState:
+    with _load_lock:
+        state = _build_state()
+        _smoke_test(state)
+        previous = _state
+        _swap(state)
     logger.info(
-        "predict len=%d label=%s prob=%.3f low_conf=%s",
-        len(text),
-        label,
-        proba,
-        low_confidence,
+        "Model hot-reloaded %s -> %s",
+        previous.version if previous is not None else None,
+        state.version,
+    )
+    return state
+
+
+def current_state() -> ModelState:
+    state = _state
+    if state is None:
+        load_model()
+        state = _state
+    return state
+
+
+def get_model_version() -> str:
+    state = _state
+    return state.version if state is not None else MODEL_VERSION
+
+
+def _is_short_raw(text: str) -> bool:
+    if has_markup_or_emoji(text):
+        return len(clean_text(text)) < SHORT_LEN
+    return len(normalize_ws(text).lower()) < SHORT_LEN
+
+
+def _prepare(text: str, use_clean: bool):
+    if use_clean:
+        cleaned = clean_text(text)
+        return cleaned, len(cleaned) < SHORT_LEN
+    return text, _is_short_raw(text)
+
+
+def _cache_key(input_text: str, state: ModelState) -> str:
+    # Cached results carry label/low_confidence, so everything _decide reads is
+    # part of the key: a threshold re-tune keeps the model but not the labels.
+    return (
+        f"{state.model_id}:{int(state.apply_clean)}:"
+        f"{state.threshold!r}:{LOW_CONF_FLOOR!r}:{hash_group(input_text)}"
     )
+
+
+def _cache_enabled() -> bool:
+    return _cache is not None or _shared_cache is not None
+
+
+def _cache_lookup(keys: list[str]) -> list[dict | None]:
+    results = [None] * len(keys)
+    missing = []
+    for i, key in enumerate(keys):
+        cached = _cache.get(key) if _cache is not None else None
+        if cached is not None:
+            results[i] = dict(cached)
+        else:
+            missing.append(i)
+
+    if _shared_cache is not None and missing:
+        found = _shared_cache.get_many([keys[i] for i in missing])
+        for i in missing:
+            shared = found.get(keys[i])
+            if shared is not None:
+                results[i] = shared
+                if _cache is not None:
+                    _cache.set(keys[i], dict(shared))
+    return results
+
+
+def _cache_store(items: list[tuple[str, dict]]):
+    if _cache is not None:
+        for key, result in items:
+            _cache.set(key, dict(result))
+    if _shared_cache is not None:
+        _shared_cache.set_many(items)
+
+
+def cache_stats() -> dict:
+    return _cache.stats() if _cache is not None else {"enabled": False}
+
+
+def shared_cache_stats() -> dict:
+    return _shared_cache.stats() if _shared_cache is not None else {"enabled": False}
+
+
+def _decide(proba: float, short: bool, threshold: float):
+    label = "toxic" if proba >= threshold else "clean"
+    low_confidence = (proba < max(threshold, LOW_CONF_FLOOR)) or short
     return {"label": label, "prob": proba, "low_confidence": low_confidence}
+
+
+def _score_prepared(state: ModelState, prepared: list[tuple[str, bool]]) -> list[dict]:
+    probas = state.model.predict_proba([x for x, _ in prepared])[:, 1]
+    return [
+        _decide(float(p), short, state.threshold)
+        for p, (_, short) in zip(probas, prepared)
+    ]
+
+
+def score_texts(texts: list[str], state: ModelState | None = None) -> list[dict]:
+    state = state or current_state()
+    if not texts:
+        return []
+    return _score_prepared(state, [_prepare(t, state.apply_clean) for t in texts])
+
+
+def predict_one(text: str):
+    state = current_state()
+    with metrics.timed("preprocess"):
+        input_text, short = _prepare(text, state.apply_clean)
+
+    key = None
+    if _cache_enabled():
+        with metrics.timed("cache"):
+            key = _cache_key(input_text, state)
+            cached = _cache_lookup([key])[0]
+        if cached is not None:
+            return cached
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Predicting (len=%d) use_clean=%s input=%s",
+            len(text),
+            state.apply_clean,
+            input_text[:200],
+        )
+
+    with metrics.timed("model"):
+        proba = float(state.model.predict_proba([input_text])[0][1])
+    result = _decide(proba, short, state.threshold)
+    if key is not None:
+        _cache_store([(key, result)])
+    return result
+
+
+def predict_batch(texts: list[str]):
+    state = current_state()
+    if not texts:
+        return []
+
+    with metrics.timed("preprocess", "batch"):
+        prepared = [_prepare(t, state.apply_clean) for t in texts]
+    if _cache_enabled():
+        with metrics.timed("cache", "batch"):
+            keys = [_cache_key(x, state) for x, _ in prepared]
+            results = _cache_lookup(keys)
+    else:
+        keys = None
+        results = [None] * len(texts)
+    pending = [i for i, r in enumerate(results) if r is None]
+
+    if pending:
+        with metrics.timed("model", "batch"):
+            scored = _score_prepared(state, [prepared[i] for i in pending])
+        for i, result in zip(pending, scored):
+            results[i] = result
+        if keys is not None:
+            _cache_store([(keys[i], results[i]) for i in pending])
+    return results
+
+
+def explain_batch(texts: list[str], top_k: int = 10) -> list[dict]:
+    state = current_state()
+    if state.explainer is None:
+        raise ExplainUnsupported(
+            f"Explanations need a linear model, got {type(state.model).__name__}"
+        )
+    if not texts:
+        return []
+    prepared = [_prepare(t, state.apply_clean) for t in texts]
+    with metrics.timed("explain", "one" if len(texts) == 1 else "batch"):
+        explained = state.explainer.explain_many([x for x, _ in prepared])
+    results = []
+    for (proba, labels, values), (_, short) in zip(explained, prepared):
+        positive, negative = top_contributions(labels, values, top_k)
+        results.append(
+            {
+                **_decide(proba, short, state.threshold),
+                "intercept": state.explainer.intercept,
+                "top_positive": positive,
+                "top_negative": negative,
+            }
+        )
+    return results
+
+
+def explain_one(text: str, top_k: int = 10) -> dict:
+    return explain_batch([text], top_k)[0]
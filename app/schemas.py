@@ -1,3 +1,5 @@
+from typing import Annotated
+
 from pydantic import BaseModel, Field, ConfigDict
 
 
@@ -8,6 +10,13 @@ class HealthOut(BaseModel):
     model_config = ConfigDict(protected_namespaces=())
 
 
+class ReloadOut(BaseModel):
+    status: str
+    model_version: str
+
+    model_config = ConfigDict(protected_namespaces=())
+
+
 class PredictIn(BaseModel):
     text: str = Field(min_length=1, max_length=5000, description="Raw comment text")
 
@@ -18,6 +27,43 @@ class PredictOut(BaseModel):
     low_confidence: bool
 
 
+class PredictBatchIn(BaseModel):
+    texts: list[Annotated[str, Field(min_length=1, max_length=5000)]] = Field(
+        min_length=1, max_length=1000, description="Raw comment texts"
+    )
+
+
+class PredictBatchOut(BaseModel):
+    items: list[PredictOut]
+
+
+class ExplainIn(BaseModel):
+    text: str = Field(min_length=1, max_length=5000, description="Raw comment text")
+    top_k: int = Field(default=10, ge=1, le=50)
+
+
+class ExplainBatchIn(BaseModel):
+    texts: list[Annotated[str, Field(min_length=1, max_length=5000)]] = Field(
+        min_length=1, max_length=100, description="Raw comment texts"
+    )
+    top_k: int = Field(default=10, ge=1, le=50)
+
+
+class Contribution(BaseModel):
+    ngram: str
+    contribution: float
+
+
+class ExplainOut(PredictOut):
+    intercept: float
+    top_positive: list[Contribution]
+    top_negative: list[Contribution]
+
+
+class ExplainBatchOut(BaseModel):
+    items: list[ExplainOut]
+
+
 class FeedbackIn(BaseModel):
     text: str = Field(min_length=1, max_length=5000)
     true_label: int = Field(ge=0, le=1, description="0=clean, 1=toxic")
@@ -0,0 +1,196 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable
+
+from app.utils import logger
+
+SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", "")
+SHARED_CACHE_SIZE = int(os.getenv("SHARED_CACHE_SIZE", "100000"))
+SHARED_CACHE_TIMEOUT = float(os.getenv("SHARED_CACHE_TIMEOUT", "0.2"))
+
+_TOUCH_INTERVAL = 60.0
+_SQLITE_MAX_VARS = 900
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS prediction_cache (
+        key TEXT PRIMARY KEY,
+        label TEXT NOT NULL,
+        prob REAL NOT NULL,
+        low_confidence INTEGER NOT NULL,
+        accessed_at REAL NOT NULL
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_prediction_cache_accessed "
+    "ON prediction_cache (accessed_at)",
+)
+
+
+class SharedCache:
+    def __init__(
+        self,
+        path: str,
+        maxsize: int = SHARED_CACHE_SIZE,
+        timeout: float = SHARED_CACHE_TIMEOUT,
+    ):
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        self.path = path
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._evict_every = max(1, min(1000, maxsize // 10))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes_since_evict = 0
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.errors = 0
+
+        conn = self._conn()
+        for stmt in _SCHEMA:
+            conn.execute(stmt)
+
+    def _conn(self) -> sqlite3.Connection:
+        pid = os.getpid()
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != pid:
+            conn = sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = pid
+        return conn
+
+    def get_many(self, keys: list[str]) -> dict[str, dict]:
+        found: dict[str, dict] = {}
+        if not keys:
+            return found
+        now = time.time()
+        stale = []
+        try:
+            conn = self._conn()
+            for start in range(0, len(keys), _SQLITE_MAX_VARS):
+                chunk = keys[start : start + _SQLITE_MAX_VARS]
+                marks = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    "SELECT key, label, prob, low_confidence, accessed_at "
+                    f"FROM prediction_cache WHERE key IN ({marks})",
+                    chunk,
+                ).fetchall()
+                for key, label, prob, low_conf, accessed_at in rows:
+                    found[key] = {
+                        "label": label,
+                        "prob": prob,
+                        "low_confidence": bool(low_conf),
+                    }
+                    if now - accessed_at > _TOUCH_INTERVAL:
+                        stale.append((now, key))
+            if stale:
+                conn.executemany(
+                    "UPDATE prediction_cache SET accessed_at = ? WHERE key = ?", stale
+                )
+        except sqlite3.Error as e:
+            self._error("get", e)
+            return {}
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, key: str) -> dict | None:
+        return self.get_many([key]).get(key)
+
+    def set_many(self, items: Iterable[tuple[str, dict]]):
+        now = time.time()
+        rows = [
+            (key, r["label"], float(r["prob"]), int(bool(r["low_confidence"])), now)
+            for key, r in items
+        ]
+        if not rows:
+            return
+        try:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO prediction_cache "
+                    "(key, label, prob, low_confidence, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            self._error("set", e)
+            return
+        with self._lock:
+            self.writes += len(rows)
+            self._writes_since_evict += len(rows)
+            due = self._writes_since_evict >= self._evict_every
+            if due:
+                self._writes_since_evict = 0
+        if due:
+            self.evict()
+
+    def set(self, key: str, value: dict):
+        self.set_many([(key, value)])
+
+    def evict(self) -> int:
+        try:
+            cur = self._conn().execute(
+                "DELETE FROM prediction_cache WHERE key IN ("
+                " SELECT key FROM prediction_cache ORDER BY accessed_at"
+                " LIMIT max(0, (SELECT COUNT(*) FROM prediction_cache) - ?))",
+                (self.maxsize,),
+            )
+        except sqlite3.Error as e:
+            self._error("evict", e)
+            return 0
+        removed = max(cur.rowcount, 0)
+        with self._lock:
+            self.evictions += removed
+        return removed
+
+    def clear(self):
+        try:
+            self._conn().execute("DELETE FROM prediction_cache")
+        except sqlite3.Error as e:
+            self._error("clear", e)
+
+    def __len__(self) -> int:
+        return (
+            self._conn().execute("SELECT COUNT(*) FROM prediction_cache").fetchone()[0]
+        )
+
+    def _error(self, op: str, e: Exception):
+        with self._lock:
+            self.errors += 1
+        logger.warning("Shared cache %s failed (%s): %s", op, self.path, e)
+
+    def stats(self) -> dict:
+        try:
+            size = len(self)
+        except sqlite3.Error:
+            size = None
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": True,
+                "path": self.path,
+                "size": size,
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "errors": self.errors,
+            }
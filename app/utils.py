@@ -1,23 +1,132 @@
+import hashlib
 import re
-import logging
-import os
 import emoji
 from bs4 import BeautifulSoup
+from bs4.dammit import EntitySubstitution
 
-logging.basicConfig(
-    level=os.getenv("LOG_LEVEL", "INFO"),
-    format="%(asctime)s %(levelname)s %(name)s - %(message)s",
-)
-logger = logging.getLogger("toxicity-api")
+from app.logs import logger  # noqa: F401  (configures logging on import)
 
 _HTML_TAG_RE = re.compile(r"<[^>]+>")
 _WS_RE = re.compile(r"\s+")
+_MARKUP_RE = re.compile(r"[<&]")
+_TAG_RE = re.compile(
+    r"""</?([A-Za-z][A-Za-z0-9-]*)"""
+    r"""(?:\s+[^\s"'<>/=]+(?:\s*=\s*(?:"[^"<>]*"|'[^'<>]*'|[^\s"'=<>`]+))?)*"""
+    r"""\s*/?>"""
+)
+_ENTITY_RE = re.compile(
+    r"&(?:([A-Za-z][A-Za-z0-9]*)|#([0-9]{1,7})|#[xX]([0-9A-Fa-f]{1,6}));"
+)
+_RAW_TEXT_TAGS = frozenset({"script", "style", "template"})
+_NAMED_ENTITIES = EntitySubstitution.HTML_ENTITY_TO_CHARACTER
+_EMOJI_CHARS = frozenset(c for e in emoji.EMOJI_DATA for c in e if not c.isascii())
 
 
-def clean_text(s: str) -> str:
+def _decode_entity(m: re.Match) -> str | None:
+    name, dec, hexa = m.groups()
+    if name is not None:
+        char = _NAMED_ENTITIES.get(name)
+        return char if char is not None else "&" + name
+    code = int(dec) if dec is not None else int(hexa, 16)
+    if code in (9, 10, 13) or 32 <= code < 127:
+        return chr(code)
+    if 160 <= code < 0xD800 or 0xE000 <= code <= 0x10FFFF:
+        return chr(code)
+    return None
+
+
+def _strip_markup(s: str) -> str | None:
+    # Tags become a single space, entities are decoded. Anything html.parser
+    # could read differently (comments, raw-text tags, odd refs) returns None
+    # so the caller falls back to BeautifulSoup.
+    parts = []
+    pos = 0
+    while True:
+        m = _MARKUP_RE.search(s, pos)
+        if m is None:
+            parts.append(s[pos:])
+            return "".join(parts)
+        i = m.start()
+        parts.append(s[pos:i])
+        nxt = s[i + 1 : i + 2]
+        if s[i] == "<":
+            tag = _TAG_RE.match(s, i)
+            if tag is not None:
+                if tag.group(1).lower() in _RAW_TEXT_TAGS:
+                    return None
+                parts.append(" ")
+                pos = tag.end()
+            elif not nxt or not (nxt.isascii() and (nxt.isalpha() or nxt in "/!?")):
+                parts.append("<")
+                pos = i + 1
+            else:
+                return None
+        else:
+            ent = _ENTITY_RE.match(s, i)
+            if ent is not None:
+                char = _decode_entity(ent)
+                if char is None:
+                    return None
+                parts.append(char)
+                pos = ent.end()
+            elif not nxt or not (nxt.isascii() and (nxt.isalpha() or nxt == "#")):
+                parts.append("&")
+                pos = i + 1
+            else:
+                return None
+
+
+def _soup_text(s: str) -> str:
+    return BeautifulSoup(s, "html.parser").get_text(separator=" ")
+
+
+def _clean_text_soup(s: str) -> str:
     if not isinstance(s, str):
         s = str(s)
-    s = BeautifulSoup(s, "html.parser").get_text(separator=" ")
+    s = _soup_text(s)
     s = emoji.replace_emoji(s, replace=" <EMOJI> ")
     s = _WS_RE.sub(" ", s).strip().lower()
     return s
+
+
+def norm_text(s: str) -> str:
+    if not isinstance(s, str):
+        s = str(s) if s is not None else ""
+    s = s.replace("\r", " ").replace("\n", " ")
+    s = " ".join(s.split()).lower()
+    return s
+
+
+def hash_group(s: str) -> str:
+    return hashlib.sha1(norm_text(s).encode("utf-8")).hexdigest()
+
+
+def has_markup_or_emoji(s: str) -> bool:
+    if "<" in s or "&" in s:
+        return True
+    return not s.isascii() and not _EMOJI_CHARS.isdisjoint(s)
+
+
+def normalize_ws(s: str) -> str:
+    return _WS_RE.sub(" ", s).strip()
+
+
+def clean_text(s: str) -> str:
+    if not isinstance(s, str):
+        s = str(s)
+    if "<" in s or "&" in s:
+        stripped = _strip_markup(s)
+        s = stripped if stripped is not None else _soup_text(s)
+    if not s.isascii() and not _EMOJI_CHARS.isdisjoint(s):
+        s = emoji.replace_emoji(s, replace=" <EMOJI> ")
+    s = _WS_RE.sub(" ", s).strip().lower()
+    return s
+
+
+def uses_clean(meta: dict) -> bool:
+    # Whether a model was trained on clean_text output, from its metadata.json.
+    notes = str(meta.get("notes", "")).lower()
+    preprocess = meta.get("preprocess", {})
+    if isinstance(preprocess, dict):
+        return bool(preprocess.get("clean_text", "clean_text" in notes))
+    return "clean_text" in notes
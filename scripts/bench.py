@@ -0,0 +1,278 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA = Path("data/processed")
+
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+# Measure the model, not the prediction cache, unless the caller overrides;
+# DATABASE_URL points at a scratch SQLite file created per run in main().
+BENCH_ENV = {"PRED_CACHE_SIZE": "0", "LOG_LEVEL": "WARNING"}
+
+# Child process for load_model cold start: imports included, like a fresh worker.
+_COLD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+from app import predict
+predict.load_model()
+print(json.dumps({"sec": time.perf_counter() - t0}))
+"""
+
+
+def sample_texts(n: int, seed: int = 42) -> list[str]:
+    # Resample real test comments so the length distribution matches production.
+    texts = pd.read_csv(DATA / "test.csv")["text"].astype(str).values
+    rng = np.random.default_rng(seed)
+    return texts[rng.integers(0, len(texts), n)].tolist()
+
+
+def summarize(latencies, wall_sec: float, items: int | None = None) -> dict:
+    ms = np.asarray(latencies, dtype=np.float64) * 1000
+    items = len(ms) if items is None else items
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "n": len(ms),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "mean_ms": round(float(ms.mean()), 4),
+        "throughput_per_sec": round(items / wall_sec, 1),
+    }
+
+
+def time_calls(fn, args, warmup: int = 20, items: int | None = None) -> dict:
+    for a in args[:warmup]:
+        fn(a)
+    lat = []
+    t0 = time.perf_counter()
+    for a in args:
+        t = time.perf_counter()
+        fn(a)
+        lat.append(time.perf_counter() - t)
+    return summarize(lat, time.perf_counter() - t0, items)
+
+
+def bench_batches(texts, batch_sizes) -> dict:
+    from app import predict
+
+    out = {}
+    for size in batch_sizes:
+        batches = [texts[i : i + size] for i in range(0, len(texts), size)]
+        # Texts per second; the last batch may be short.
+        out[f"batch_{size}"] = time_calls(
+            predict.predict_batch, batches, warmup=2, items=len(texts)
+        )
+    return out
+
+
+def bench_cold_start(runs: int) -> dict:
+    lat = []
+    t0 = time.perf_counter()
+    for _ in range(runs):
+        r = subprocess.run(
+            [sys.executable, "-c", _COLD, str(ROOT)],
+            capture_output=True,
+            text=True,
+            check=True,
+            env=os.environ.copy(),
+        )
+        lat.append(json.loads(r.stdout.strip().splitlines()[-1])["sec"])
+    return summarize(lat, time.perf_counter() - t0)
+
+
+def bench_http(texts, levels) -> dict:
+    from fastapi.testclient import TestClient
+
+    from app.main import app, _writer
+
+    out = {}
+    with TestClient(app) as client:
+
+        def call(text):
+            t = time.perf_counter()
+            r = client.post("/predict", json={"text": text})
+            r.raise_for_status()
+            return time.perf_counter() - t
+
+        for text in texts[:20]:
+            call(text)
+        for level in levels:
+            # Requests overlap inside the app's event loop via the client portal.
+            with ThreadPoolExecutor(max_workers=level) as pool:
+                t0 = time.perf_counter()
+                lat = list(pool.map(call, texts))
+                wall = time.perf_counter() - t0
+            out[f"concurrency_{level}"] = summarize(lat, wall)
+        persistence = _writer.stats()
+    out["persistence"] = persistence
+    return out
+
+
+def _git_commit() -> str | None:
+    try:
+        r = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return r.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(
+    current: dict, baseline: dict, tolerance: float, min_delta_ms: float = 0.05
+) -> list[str]:
+    # Flags p95 growth or throughput loss beyond tolerance (fraction); changes
+    # under min_delta_ms of mean latency are timer noise on microsecond paths.
+    regressions = []
+    for name, res in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or "p95_ms" not in res or "p95_ms" not in base:
+            continue
+        d_p95 = res["p95_ms"] / max(base["p95_ms"], 1e-9) - 1
+        d_tput = res["throughput_per_sec"] / max(base["throughput_per_sec"], 1e-9) - 1
+        moved = abs(res["mean_ms"] - base["mean_ms"]) >= min_delta_ms
+        flag = moved and (d_p95 > tolerance or d_tput < -tolerance)
+        print(
+            f"{name:<28} p95 {base['p95_ms']:>9.3f} -> {res['p95_ms']:>9.3f}ms "
+            f"({d_p95:+.1%}) | tput {d_tput:+.1%}{'  REGRESSION' if flag else ''}"
+        )
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+@contextlib.contextmanager
+def _bench_env():
+    # The app reads its config at import time, so this must wrap the first
+    # app import; cold-start children inherit it.
+    with tempfile.TemporaryDirectory(prefix="bench_") as tmp:
+        env = {"DATABASE_URL": f"sqlite:///{tmp}/bench.db", **BENCH_ENV}
+        saved = {k: os.environ.get(k) for k in env}
+        for key, value in env.items():
+            os.environ.setdefault(key, value)
+        try:
+            yield {k: os.environ[k] for k in env}
+        finally:
+            for key, value in saved.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+            if "app.db" in sys.modules:
+                sys.modules["app.db"].engine.dispose()
+
+
+def main(**kwargs):
+    with _bench_env() as env:
+        _run(env=env, **kwargs)
+
+
+def _run(
+    n=500,
+    batch_sizes=(1, 8, 32, 128),
+    levels=(1, 4, 16),
+    cold_runs=5,
+    out=None,
+    baseline=None,
+    tolerance=0.2,
+    min_delta_ms=0.05,
+    env=None,
+):
+    from app import predict
+    from app.utils import clean_text
+
+    texts = sample_texts(n)
+    lengths = np.array([len(t) for t in texts])
+    predict.load_model()
+    state = predict.current_state()
+
+    results = {}
+    results["clean_text"] = time_calls(clean_text, texts)
+    results["predict_one"] = time_calls(predict.predict_one, texts)
+    results.update(bench_batches(texts, batch_sizes))
+    results["load_model_cold"] = bench_cold_start(cold_runs)
+    http = bench_http(texts, levels)
+    persistence = http.pop("persistence")
+    results.update({f"http_predict_{k}": v for k, v in http.items()})
+
+    for name, res in results.items():
+        print(
+            f"[{name:>24}] p50={res['p50_ms']:9.3f}ms p95={res['p95_ms']:9.3f}ms "
+            f"p99={res['p99_ms']:9.3f}ms | {res['throughput_per_sec']:10.1f}/s"
+        )
+
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "model_file": state.model_file,
+            "model_version": state.version,
+            "n_texts": n,
+            "text_len": {f"p{q}": int(np.percentile(lengths, q)) for q in (50, 95, 99)},
+            "env": env or {k: os.environ.get(k) for k in BENCH_ENV},
+            "persistence": persistence,
+        },
+        "results": results,
+    }
+    if out is None:
+        out = Path("benchmarks") / f"bench_{report['meta']['commit'] or 'local'}.json"
+    out = Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"[ASSET] Saved benchmark -> {out}")
+
+    if baseline:
+        base = json.loads(Path(baseline).read_text(encoding="utf-8"))
+        print(f"\n[COMPARE] vs {baseline} (commit {base['meta'].get('commit')})")
+        if compare(report, base, tolerance, min_delta_ms):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--n", type=int, default=500, help="texts per benchmark")
+    p.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 128])
+    p.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    p.add_argument("--cold-runs", type=int, default=5)
+    p.add_argument("--out", help="JSON path (default benchmarks/bench_<commit>.json)")
+    p.add_argument("--baseline", help="previous JSON to compare against")
+    p.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed p95 growth / throughput loss before exiting non-zero",
+    )
+    p.add_argument("--min-delta-ms", type=float, default=0.05)
+    args = p.parse_args()
+    main(
+        n=args.n,
+        batch_sizes=args.batch_sizes,
+        levels=args.concurrency,
+        cold_runs=args.cold_runs,
+        out=args.out,
+        baseline=args.baseline,
+        tolerance=args.tolerance,
+        min_delta_ms=args.min_delta_ms,
+    )
@@ -0,0 +1,68 @@
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    from app.utils import clean_text, _clean_text_soup
+except Exception:
+    import sys
+
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+    from app.utils import clean_text, _clean_text_soup
+
+DATA = Path("data/processed")
+
+MARKUP_WRAPS = [
+    "<b>{}</b>",
+    "<p class='comment'>{}</p>",
+    "{} &amp; more<br/>",
+    "&quot;{}&quot; &lt;3",
+]
+
+
+def load_corpus():
+    texts = []
+    for path in sorted(DATA.glob("*.csv")):
+        texts.extend(pd.read_csv(path)["text"].astype(str).tolist())
+    return texts
+
+
+def with_markup(texts):
+    return [MARKUP_WRAPS[i % len(MARKUP_WRAPS)].format(t) for i, t in enumerate(texts)]
+
+
+def bench(fn, texts, repeat):
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for s in texts:
+            fn(s)
+        runs.append(time.perf_counter() - t0)
+    return statistics.median(runs)
+
+
+def main(repeat=5):
+    texts = load_corpus()
+    if not texts:
+        raise FileNotFoundError(f"No CSV files in {DATA}")
+
+    for name, corpus in (("plain", texts), ("markup", with_markup(texts))):
+        mismatches = sum(clean_text(s) != _clean_text_soup(s) for s in corpus)
+        t_soup = bench(_clean_text_soup, corpus, repeat)
+        t_fast = bench(clean_text, corpus, repeat)
+        n = len(corpus)
+        print(
+            f"[{name:>6}] n={n} | soup={t_soup / n * 1e6:8.2f}us/text "
+            f"| fast={t_fast / n * 1e6:8.2f}us/text | speedup={t_soup / t_fast:6.1f}x "
+            f"| mismatches={mismatches}"
+        )
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--repeat", type=int, default=5)
+    args = p.parse_args()
+    main(repeat=args.repeat)
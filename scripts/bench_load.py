@@ -0,0 +1,131 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+try:
+    from app.engine import compile_pipeline, save_mmap
+    from app.predict import _resolve_model_file
+except Exception:
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+    from app.engine import compile_pipeline, save_mmap
+    from app.predict import _resolve_model_file
+
+ROOT = Path(__file__).resolve().parents[1]
+META = Path("models/metadata.json")
+
+# Child process: load the artifact, score once, report time-to-ready and memory,
+# then wait on stdin so every worker is alive when smaps is read.
+_WORKER = r"""
+import json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, sys.argv[2])
+from app.engine import load_artifact
+model = load_artifact(sys.argv[1])
+model.predict_proba(["warm up text"])
+ready = time.perf_counter() - t0
+print(json.dumps({"ready_sec": ready}), flush=True)
+sys.stdin.read()
+"""
+
+
+def _smaps_rollup(pid: int) -> dict:
+    out = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", encoding="utf-8") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss"):
+                    out[key.lower()] = int(rest.split()[0])
+    except OSError:
+        pass
+    return out
+
+
+def run_workers(kind: str, path: Path, workers: int) -> dict:
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", _WORKER, str(path), str(ROOT)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for _ in range(workers)
+    ]
+    try:
+        ready = [json.loads(p.stdout.readline())["ready_sec"] for p in procs]
+        mem = [_smaps_rollup(p.pid) for p in procs]
+    finally:
+        for p in procs:
+            p.stdin.close()
+            p.wait()
+    return {
+        "kind": kind,
+        "workers": workers,
+        "ready_median_ms": round(statistics.median(ready) * 1000, 1),
+        "ready_max_ms": round(max(ready) * 1000, 1),
+        "rss_total_mb": round(sum(m.get("rss", 0) for m in mem) / 1024, 1),
+        "pss_total_mb": round(sum(m.get("pss", 0) for m in mem) / 1024, 1),
+    }
+
+
+def synthetic_scorer(n_terms: int, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    scorer = compile_pipeline(joblib.load(_model_file()), source="synthetic")
+    idf = rng.uniform(1.0, 10.0, n_terms)
+    coef = rng.normal(0.0, 1.0, n_terms)
+    scorer.terms = {
+        f"tok{i}": (float(idf[i]), float(idf[i] * coef[i])) for i in range(n_terms)
+    }
+    return scorer
+
+
+def _model_file() -> Path:
+    meta = json.loads(META.read_text(encoding="utf-8"))
+    return _resolve_model_file(str(meta["model_file"]))
+
+
+def main(workers=4, synthetic=0):
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        if synthetic:
+            scorer = synthetic_scorer(synthetic)
+            pickled = tmp / "synthetic.engine.joblib"
+            joblib.dump(scorer, pickled)
+            artifacts = [("joblib-engine", pickled)]
+        else:
+            model_file = _model_file()
+            scorer = compile_pipeline(joblib.load(model_file), source=str(model_file))
+            artifacts = [("joblib-pipeline", model_file)]
+        artifacts.append(("mmap", save_mmap(scorer, tmp / "model.mmap")))
+        print(f"[MODEL] terms={len(scorer)} workers={workers}")
+
+        for kind, path in artifacts:
+            t0 = time.perf_counter()
+            r = run_workers(kind, path, workers)
+            print(
+                f"[{r['kind']:>15}] ready median={r['ready_median_ms']:8.1f}ms "
+                f"max={r['ready_max_ms']:8.1f}ms | RSS total={r['rss_total_mb']:8.1f}MB "
+                f"| PSS total={r['pss_total_mb']:8.1f}MB "
+                f"| wall={time.perf_counter() - t0:.2f}s"
+            )
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--workers", type=int, default=4)
+    p.add_argument(
+        "--synthetic",
+        type=int,
+        default=0,
+        help="benchmark a random vocabulary of N terms instead of the trained model",
+    )
+    args = p.parse_args()
+    main(workers=args.workers, synthetic=args.synthetic)
@@ -0,0 +1,78 @@
+import numpy as np
+
+from thresholds import macro_f1
+
+# Bytes of float64 weights materialized per block of resamples.
+BLOCK_BYTES = 64 * 2**20
+
+
+def macro_f1_weighted(pred, y, w) -> np.ndarray:
+    # w: (B, n) resample counts; one matrix-vector product per confusion cell
+    # instead of re-indexing the arrays B times.
+    pred = np.asarray(pred, dtype=bool)
+    y = np.asarray(y, dtype=bool)
+    tp = w @ (pred & y)
+    fp = w @ (pred & ~y)
+    fn = w @ (~pred & y)
+    tn = w @ (~pred & ~y)
+    return macro_f1(tp, fp, fn, tn)
+
+
+def _auc_sorted(p_sorted, y_sorted, w) -> np.ndarray:
+    pos = w * y_sorted
+    neg = w * ~y_sorted
+    starts = np.flatnonzero(np.r_[True, p_sorted[1:] != p_sorted[:-1]])
+    if len(starts) < len(p_sorted):
+        pos = np.add.reduceat(pos, starts, axis=1)
+        neg = np.add.reduceat(neg, starts, axis=1)
+    neg_below = np.cumsum(neg, axis=1) - neg
+    num = (pos * (neg_below + 0.5 * neg)).sum(axis=1)
+    den = pos.sum(axis=1) * neg.sum(axis=1)
+    return np.divide(num, den, out=np.full(len(num), np.nan), where=den > 0)
+
+
+def auc_weighted(proba, y, w) -> np.ndarray:
+    # Mann-Whitney AUC with ties counted as 1/2, same value as roc_auc_score
+    # for unit weights: one sort, then a cumsum over negatives per resample.
+    proba = np.asarray(proba, dtype=np.float64)
+    y = np.asarray(y, dtype=bool)
+    order = np.argsort(proba, kind="stable")
+    return _auc_sorted(proba[order], y[order], np.atleast_2d(w)[:, order])
+
+
+def _weight_blocks(n: int, n_boot: int, rng):
+    block = max(1, min(n_boot, BLOCK_BYTES // (8 * max(n, 1))))
+    for start in range(0, n_boot, block):
+        size = min(block, n_boot - start)
+        w = np.empty((size, n), dtype=np.float64)
+        for i in range(size):
+            # Draw counts == classic resampling with replacement.
+            w[i] = np.bincount(rng.integers(0, n, n), minlength=n)
+        yield w
+
+
+def bootstrap_metrics(
+    proba, y, threshold: float = 0.5, n_boot: int = 1000, seed: int = 42
+) -> dict[str, np.ndarray]:
+    # Resample counts are exchangeable, so they are drawn directly against the
+    # score-sorted arrays and the sort is shared by every resample.
+    proba = np.asarray(proba, dtype=np.float64)
+    order = np.argsort(proba, kind="stable")
+    proba = proba[order]
+    y = np.asarray(y).astype(bool)[order]
+    pred = proba >= threshold
+    rng = np.random.default_rng(seed)
+    f1s, aucs = [], []
+    for w in _weight_blocks(len(y), n_boot, rng):
+        f1s.append(macro_f1_weighted(pred, y, w))
+        aucs.append(_auc_sorted(proba, y, w))
+    return {"macro_f1": np.concatenate(f1s), "roc_auc": np.concatenate(aucs)}
+
+
+def percentile_ci(samples, alpha: float = 0.05) -> tuple[float, float]:
+    samples = np.asarray(samples, dtype=np.float64)
+    samples = samples[~np.isnan(samples)]
+    if not len(samples):
+        return float("nan"), float("nan")
+    lo, hi = np.quantile(samples, [alpha / 2, 1 - alpha / 2])
+    return float(lo), float(hi)
@@ -0,0 +1,84 @@
+import time
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import ParameterSampler, cross_validate
+
+
+# Random search that stops sampling once the wall-clock budget is spent. The
+# budget is a soft limit: it is checked before each trial, so the search can
+# overrun by up to one candidate's cross-validation. Same result attributes as the sklearn searches (cv_results_, best_params_,
+# best_estimator_) so tune.py can treat it interchangeably.
+class BudgetedRandomSearch:
+    def __init__(
+        self,
+        estimator,
+        param_distributions,
+        budget_sec: float,
+        max_trials: int = 1000,
+        cv=3,
+        n_jobs=-1,
+        random_state=42,
+        verbose=0,
+    ):
+        self.estimator = estimator
+        self.param_distributions = param_distributions
+        self.budget_sec = budget_sec
+        self.max_trials = max_trials
+        self.cv = cv
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.verbose = verbose
+
+    def fit(self, X, y):
+        sampler = ParameterSampler(
+            self.param_distributions,
+            n_iter=self.max_trials,
+            random_state=self.random_state,
+        )
+        params, means, stds, fit_times, score_times = [], [], [], [], []
+        t0 = time.perf_counter()
+        for i, candidate in enumerate(sampler):
+            if time.perf_counter() - t0 >= self.budget_sec:
+                break
+            res = cross_validate(
+                clone(self.estimator).set_params(**candidate),
+                X,
+                y,
+                cv=self.cv,
+                scoring="f1_macro",
+                n_jobs=self.n_jobs,
+                error_score=np.nan,
+            )
+            scores = res["test_score"]
+            params.append(candidate)
+            means.append(float(np.mean(scores)))
+            stds.append(float(np.std(scores)))
+            fit_times.append(float(np.mean(res["fit_time"])))
+            score_times.append(float(np.mean(res["score_time"])))
+            if self.verbose:
+                print(f"[TRIAL {i}] f1={means[-1]:.4f} {candidate}")
+        if not params:
+            raise ValueError("Time budget too small to evaluate a single candidate")
+        self.n_trials_ = len(params)
+
+        mean = np.array(means)
+        self.cv_results_ = {
+            "params": params,
+            "mean_test_score": mean,
+            "std_test_score": np.array(stds),
+            "mean_fit_time": np.array(fit_times),
+            "mean_score_time": np.array(score_times),
+        }
+        self.best_index_ = int(np.nanargmax(mean))
+        self.best_params_ = params[self.best_index_]
+        self.best_score_ = float(mean[self.best_index_])
+        self.search_time_ = time.perf_counter() - t0
+        if self.verbose:
+            print(
+                f"Evaluated {len(params)} candidates in {self.search_time_:.1f}s "
+                f"(budget {self.budget_sec:.0f}s)"
+            )
+        self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_)
+        self.best_estimator_.fit(X, y)
+        return self
@@ -0,0 +1,182 @@
+import time
+from itertools import groupby
+from numbers import Integral
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+from sklearn.metrics import f1_score
+from sklearn.model_selection import ParameterGrid, check_cv
+
+# Grid keys the cache understands, by the stage they invalidate.
+COUNT_PARAMS = {"ngram_range"}
+FILTER_PARAMS = {"min_df", "max_df", "max_features"}
+WEIGHT_PARAMS = {"norm", "use_idf", "smooth_idf", "sublinear_tf"}
+
+
+def _split_key(key: str) -> tuple[str, str]:
+    step, _, name = key.partition("__")
+    return step, name
+
+
+def _limit_mask(counts, min_df, max_df, max_features) -> np.ndarray:
+    # CountVectorizer._limit_features on a train-fold count matrix whose
+    # columns are already the fold vocabulary in alphabetical order.
+    n_doc = counts.shape[0]
+    high = max_df if isinstance(max_df, Integral) else max_df * n_doc
+    low = min_df if isinstance(min_df, Integral) else min_df * n_doc
+    if high < low:
+        raise ValueError("max_df corresponds to < documents than min_df")
+    dfs = np.bincount(counts.indices, minlength=counts.shape[1])
+    mask = (dfs <= high) & (dfs >= low)
+    if max_features is not None and mask.sum() > max_features:
+        tfs = np.asarray(counts.sum(axis=0)).ravel()
+        mask_inds = (-tfs[mask]).argsort()[:max_features]
+        new_mask = np.zeros(len(dfs), dtype=bool)
+        new_mask[np.where(mask)[0][mask_inds]] = True
+        mask = new_mask
+    if not mask.any():
+        raise ValueError(
+            "After pruning, no terms remain. Try a lower min_df or a higher max_df."
+        )
+    return mask
+
+
+# GridSearchCV for Pipeline(TfidfVectorizer, clf) with the same folds, scores
+# and tie-breaking. Count matrices are built once per ngram_range over the whole
+# corpus; each fold keeps its own vocabulary columns, min_df/max_df/max_features
+# become column masks, IDF is refit per filter and only the classifier per C.
+class CachedTfidfSearch:
+    def __init__(self, estimator, param_grid, cv=3, refit=True, verbose=0):
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.cv = cv
+        self.refit = refit
+        self.verbose = verbose
+
+    def _check(self):
+        steps = self.estimator.named_steps
+        if len(steps) != 2 or type(self.estimator[0]).__name__ != "TfidfVectorizer":
+            raise ValueError("CachedTfidfSearch needs Pipeline(TfidfVectorizer, clf)")
+        self.vec_name_, self.clf_name_ = list(steps)
+        known = COUNT_PARAMS | FILTER_PARAMS | WEIGHT_PARAMS
+        for key in ParameterGrid(self.param_grid).param_grid[0]:
+            step, name = _split_key(key)
+            if step == self.vec_name_ and name not in known:
+                raise ValueError(f"{key} cannot be served from cached counts")
+            if step not in (self.vec_name_, self.clf_name_):
+                raise ValueError(f"Unknown pipeline step in {key}")
+
+    def _vec_params(self, params: dict) -> dict:
+        base = self.estimator[0].get_params()
+        for key, value in params.items():
+            step, name = _split_key(key)
+            if step == self.vec_name_:
+                base[name] = value
+        return base
+
+    def _clf_params(self, params: dict) -> dict:
+        return {
+            _split_key(k)[1]: v
+            for k, v in params.items()
+            if _split_key(k)[0] == self.clf_name_
+        }
+
+    def _groups(self, candidates, indices, names):
+        def key(i):
+            vec = self._vec_params(candidates[i])
+            return tuple(repr(vec[n]) for n in sorted(names))
+
+        for _, group in groupby(sorted(indices, key=key), key=key):
+            group = list(group)
+            yield self._vec_params(candidates[group[0]]), group
+
+    def fit(self, X, y):
+        self._check()
+        X = np.asarray(X, dtype=object)
+        y = np.asarray(y)
+        candidates = list(ParameterGrid(self.param_grid))
+        splits = list(check_cv(self.cv, y, classifier=True).split(X, y))
+        scores = np.zeros((len(candidates), len(splits)))
+        fit_times = np.zeros_like(scores)
+        score_times = np.zeros_like(scores)
+        count_keys = set(CountVectorizer().get_params()) - FILTER_PARAMS
+        t0 = time.perf_counter()
+
+        for vec, by_count in self._groups(
+            candidates, range(len(candidates)), COUNT_PARAMS
+        ):
+            counter = CountVectorizer(
+                **{k: v for k, v in vec.items() if k in count_keys}
+            )
+            full = counter.fit_transform(X).astype(np.float64)
+            for f, (train_idx, test_idx) in enumerate(splits):
+                tr_full = full[train_idx]
+                vocab = np.flatnonzero(np.diff(tr_full.tocsc().indptr))
+                tr_counts = tr_full[:, vocab]
+                te_counts = full[test_idx][:, vocab]
+                for v, by_filter in self._groups(candidates, by_count, FILTER_PARAMS):
+                    try:
+                        mask = _limit_mask(
+                            tr_counts, v["min_df"], v["max_df"], v["max_features"]
+                        )
+                    except ValueError as e:
+                        # GridSearchCV(error_score=nan): the fit fails for this
+                        # fold only, the search goes on.
+                        scores[by_filter, f] = np.nan
+                        if self.verbose:
+                            print(f"[CACHED] fold {f}: {e}")
+                        continue
+                    tr_kept, te_kept = tr_counts[:, mask], te_counts[:, mask]
+                    for w, by_weight in self._groups(
+                        candidates, by_filter, WEIGHT_PARAMS
+                    ):
+                        tfidf = TfidfTransformer(
+                            **{k: w[k] for k in sorted(WEIGHT_PARAMS)}
+                        ).fit(tr_kept)
+                        Xtr = tfidf.transform(tr_kept)
+                        Xte = tfidf.transform(te_kept)
+                        for i in by_weight:
+                            clf = clone(self.estimator[-1]).set_params(
+                                **self._clf_params(candidates[i])
+                            )
+                            t_fit = time.perf_counter()
+                            clf.fit(Xtr, y[train_idx])
+                            t_score = time.perf_counter()
+                            scores[i, f] = f1_score(
+                                y[test_idx], clf.predict(Xte), average="macro"
+                            )
+                            fit_times[i, f] = t_score - t_fit
+                            score_times[i, f] = time.perf_counter() - t_score
+            if self.verbose:
+                print(
+                    f"[CACHED] ngram_range={vec['ngram_range']}: "
+                    f"{len(by_count)} candidates x {len(splits)} folds"
+                )
+
+        mean = np.average(scores, axis=1)
+        self.cv_results_ = {
+            "params": candidates,
+            "mean_test_score": mean,
+            "std_test_score": np.std(scores, axis=1),
+            "mean_fit_time": fit_times.mean(axis=1),
+            "mean_score_time": score_times.mean(axis=1),
+            **{f"split{f}_test_score": scores[:, f] for f in range(len(splits))},
+        }
+        # GridSearchCV picks the first candidate among equal mean scores; a
+        # candidate with any failed fold has a NaN mean and is never chosen.
+        if np.isnan(mean).all():
+            raise ValueError("All candidates failed on at least one fold")
+        self.best_index_ = int(np.nanargmax(mean))
+        self.best_params_ = candidates[self.best_index_]
+        self.best_score_ = float(mean[self.best_index_])
+        self.search_time_ = time.perf_counter() - t0
+        if self.verbose:
+            print(
+                f"Fitting {len(splits)} folds for each of {len(candidates)} "
+                f"candidates in {self.search_time_:.2f}s (cached counts)"
+            )
+        if self.refit:
+            self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_)
+            self.best_estimator_.fit(X, y)
+        return self
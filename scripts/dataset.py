@@ -0,0 +1,79 @@
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    from app.utils import clean_text, hash_group, uses_clean  # noqa: F401
+except Exception:
+    import sys
+
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+    from app.utils import clean_text, hash_group, uses_clean  # noqa: F401
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # optional: CSV only
+    pa = None
+    feather = None
+
+DATA = Path("data/processed")
+_ARROW_STRINGS = (
+    {
+        pa.string(): pd.StringDtype("pyarrow"),
+        pa.large_string(): pd.StringDtype("pyarrow"),
+    }
+    if pa is not None
+    else {}
+)
+COLUMNS = ["text", "label", "clean", "group"]
+
+
+def columnar_path(split: str, data: Path = DATA) -> Path:
+    return data / f"{split}.feather"
+
+
+def has_columnar(split: str, data: Path = DATA) -> bool:
+    if feather is None:
+        return False
+    path = columnar_path(split, data)
+    csv = data / f"{split}.csv"
+    if not path.exists():
+        return False
+    # CSVs stay the source of truth: ignore an artifact older than its CSV.
+    return not csv.exists() or path.stat().st_mtime >= csv.stat().st_mtime
+
+
+def load_split(split: str, clean: bool = False, data: Path = DATA) -> pd.DataFrame:
+    columns = ["text", "label", "clean"] if clean else ["text", "label"]
+    if has_columnar(split, data):
+        table = feather.read_table(
+            columnar_path(split, data), columns=columns, memory_map=True
+        )
+        # Keep strings in the mapped Arrow buffers (pandas 2 would otherwise
+        # build one Python object per row) and skip block consolidation.
+        return table.to_pandas(
+            split_blocks=True,
+            self_destruct=True,
+            types_mapper=_ARROW_STRINGS.get,
+        )
+
+    df = pd.read_csv(data / f"{split}.csv")
+    df["text"] = df["text"].astype(str)
+    if clean:
+        df["clean"] = df["text"].map(clean_text)
+    return df[columns]
+
+
+def write_columnar(df: pd.DataFrame, path: Path) -> bool:
+    if pa is None:
+        return False
+    out = df.reset_index(drop=True)
+    if "clean" not in out:
+        out["clean"] = out["text"].map(clean_text)
+    if "group" not in out:
+        out["group"] = out["text"].map(hash_group)
+    table = pa.Table.from_pandas(out[COLUMNS], preserve_index=False)
+    # Uncompressed Arrow IPC so readers can memory-map it.
+    feather.write_feather(table, path, compression="uncompressed")
+    return True
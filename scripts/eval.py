@@ -1,24 +1,134 @@
 import json
+import statistics
+import time
 from pathlib import Path
 
 import joblib
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.metrics import (
+    accuracy_score,
+    classification_report,
+    confusion_matrix,
+    f1_score,
+    roc_auc_score,
+)
+
+try:
+    from app.predict import _resolve_model_file
+    from app.utils import clean_text
+except Exception:
+    import sys
+
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+    from app.predict import _resolve_model_file
+    from app.utils import clean_text
+
+from bootstrap import bootstrap_metrics, percentile_ci
+from dataset import load_split, uses_clean
+from train import iter_chunks
 
-DATA = Path("data/processed")
 MODELS = Path("models")
 ART = Path("notebooks")
+# Rows per scoring task; below this the split is scored in-process.
+MIN_CHUNK = 20_000
+LENGTH_BINS = [0, 32, 64, 128, 256, 512, 1024, np.inf]
+LENGTH_LABELS = [f"{a}-{b - 1}" for a, b in zip(LENGTH_BINS, LENGTH_BINS[1:-1])] + [
+    f"{LENGTH_BINS[-2]}+"
+]
+SLICES = ("source", "length")
 
 
 def load_latest_model():
     meta = json.load(open(MODELS / "metadata.json", encoding="utf-8"))
-    model = joblib.load(meta["model_file"])
+    model = joblib.load(_resolve_model_file(str(meta["model_file"])))
     return model, meta
 
 
+def load_eval_frame(split: str, extra=(), clean: bool = False) -> pd.DataFrame:
+    df = load_split(split, clean=clean)
+    frames = [df.assign(source=split)]
+    for path in extra:
+        for texts, y in iter_chunks([path]):
+            part = pd.DataFrame({"text": texts.values, "label": y})
+            if clean:
+                part["clean"] = part["text"].map(clean_text)
+            frames.append(part.assign(source=Path(path).stem))
+    out = pd.concat(frames, ignore_index=True)
+    out["input"] = out["clean" if clean else "text"].astype(str)
+    lengths = out["text"].str.len()
+    out["length"] = pd.cut(lengths, LENGTH_BINS, right=False, labels=LENGTH_LABELS)
+    return out
+
+
+def _proba_chunk(model, texts) -> np.ndarray:
+    return model.predict_proba(texts)[:, 1]
+
+
+def score_parallel(model, texts, n_jobs=-1) -> np.ndarray:
+    # One vectorization pass: every metric below is derived from this array.
+    texts = list(texts)
+    n_chunks = min(effective_n_jobs(n_jobs), max(1, len(texts) // MIN_CHUNK))
+    if n_chunks <= 1:
+        return _proba_chunk(model, texts)
+    bounds = np.linspace(0, len(texts), n_chunks + 1).astype(int)
+    parts = Parallel(n_jobs=n_chunks)(
+        delayed(_proba_chunk)(model, texts[a:b]) for a, b in zip(bounds, bounds[1:])
+    )
+    return np.concatenate(parts)
+
+
+def evaluate(proba, y, threshold=0.5, n_boot=1000, seed=42) -> dict:
+    y = np.asarray(y)
+    pred = (proba >= threshold).astype(int)
+    both = len(np.unique(y)) == 2
+    out = {
+        "n": int(len(y)),
+        "pos_rate": float(y.mean()) if len(y) else float("nan"),
+        "accuracy": float(accuracy_score(y, pred)),
+        "macro_f1": float(f1_score(y, pred, average="macro")),
+        "roc_auc": float(roc_auc_score(y, proba)) if both else float("nan"),
+    }
+    if n_boot:
+        boot = bootstrap_metrics(proba, y, threshold, n_boot=n_boot, seed=seed)
+        for name, samples in boot.items():
+            out[f"{name}_ci"] = list(percentile_ci(samples))
+    return out
+
+
+def slice_metrics(df, proba, by, threshold=0.5, n_boot=1000, seed=42) -> list:
+    rows = []
+    for key, idx in df.groupby(by, sort=True, observed=True).indices.items():
+        res = evaluate(proba[idx], df["label"].values[idx], threshold, n_boot, seed)
+        rows.append({"slice": by, "value": str(key), **res})
+    return rows
+
+
+def _fmt(res: dict, name: str) -> str:
+    if np.isnan(res[name]):
+        return "n/a"
+    value = f"{res[name]:.4f}"
+    if f"{name}_ci" in res:
+        lo, hi = res[f"{name}_ci"]
+        value += f" [{lo:.4f}, {hi:.4f}]"
+    return value
+
+
+def _nan_to_none(obj):
+    # NaN (single-class slices) -> null, so strict JSON parsers accept it.
+    if isinstance(obj, dict):
+        return {k: _nan_to_none(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_nan_to_none(v) for v in obj]
+    if isinstance(obj, float) and obj != obj:
+        return None
+    return obj
+
+
 def plot_confusion(cm: np.ndarray, out_path: Path, labels=("clean", "toxic")):
+    import matplotlib.pyplot as plt
+
     fig = plt.figure(figsize=(4, 4))
     plt.imshow(cm, interpolation="nearest")
     plt.title("Confusion Matrix")
@@ -33,29 +143,141 @@ def plot_confusion(cm: np.ndarray, out_path: Path, labels=("clean", "toxic")):
     plt.close(fig)
 
 
-def main(split="test"):
-    df = pd.read_csv(DATA / f"{split}.csv")
-    df["text"] = df["text"].astype(str)
+def describe_features(model) -> tuple[str, int]:
+    steps = getattr(model, "named_steps", {})
+    vec = next(iter(steps.values()), None)
+    if hasattr(vec, "vocabulary_"):
+        return "tfidf", len(vec.vocabulary_)
+    if hasattr(vec, "n_features"):
+        return "hashing", vec.n_features
+    return type(model).__name__, len(model) if hasattr(model, "__len__") else 0
+
+
+def single_latency_us(model, texts, n=200, repeat=3) -> float:
+    sample = texts[:n]
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for t in sample:
+            model.predict_proba([t])
+        runs.append((time.perf_counter() - t0) / len(sample))
+    return statistics.median(runs) * 1e6
+
+
+def compare_entry(arg: str, default_clean: bool) -> tuple[Path, bool]:
+    # A metadata JSON brings its model's own preprocessing; a bare .joblib is
+    # assumed to share the current model's.
+    path = Path(arg)
+    if path.suffix == ".json":
+        meta = json.loads(path.read_text(encoding="utf-8"))
+        return _resolve_model_file(str(meta["model_file"])), uses_clean(meta)
+    return path, default_clean
 
+
+def compare_models(entries, df, threshold: float = 0.5):
+    y_true = df["label"].values
+    inputs = {}
+    print(
+        f"\n{'model':<40} {'clean':>5} {'features':>8} {'dim':>9} {'size_mb':>8} "
+        f"{'acc':>7} {'f1':>7} {'auc':>7} {'batch_us':>9} {'single_us':>10}"
+    )
+    for path, clean in entries:
+        path = Path(path)
+        if clean not in inputs:
+            col = df["clean"] if "clean" in df else df["text"].map(clean_text)
+            inputs[clean] = (col if clean else df["text"]).astype(str).tolist()
+        texts = inputs[clean]
+        model = joblib.load(path)
+        t0 = time.perf_counter()
+        proba = model.predict_proba(texts)[:, 1]
+        batch_us = (time.perf_counter() - t0) / len(texts) * 1e6
+        y_pred = (proba >= threshold).astype(int)
+        kind, dim = describe_features(model)
+        print(
+            f"{path.name:<40} {'yes' if clean else 'no':>5} {kind:>8} {dim:>9} "
+            f"{path.stat().st_size / 2**20:>8.2f} "
+            f"{accuracy_score(y_true, y_pred):>7.4f} "
+            f"{f1_score(y_true, y_pred, average='macro'):>7.4f} "
+            f"{roc_auc_score(y_true, proba):>7.4f} "
+            f"{batch_us:>9.1f} {single_latency_us(model, texts):>10.1f}"
+        )
+
+
+def main(
+    split="test",
+    compare=(),
+    extra=(),
+    slices=SLICES,
+    n_boot=1000,
+    threshold="0.5",
+    n_jobs=-1,
+    plot=True,
+    json_out=None,
+):
     model, meta = load_latest_model()
+    clean = uses_clean(meta)
+    df = load_eval_frame(split, extra, clean=clean)
+    t = float(meta.get("threshold", 0.5)) if threshold == "meta" else float(threshold)
 
+    t0 = time.perf_counter()
     y_true = df["label"].values
-    y_pred = model.predict(df["text"])
+    y_proba = score_parallel(model, df["input"].tolist(), n_jobs=n_jobs)
+    score_sec = time.perf_counter() - t0
+    y_pred = (y_proba >= t).astype(int)
     print("[META]", json.dumps(meta, indent=2, ensure_ascii=False))
+    print(
+        f"[SCORE] rows={len(df)} in {score_sec:.2f}s "
+        f"({len(df) / max(score_sec, 1e-9):.0f} rows/s) threshold={t:.4f}"
+    )
     print("\n[CLASSIFICATION REPORT]")
     print(classification_report(y_true, y_pred, digits=4))
 
-    cm = confusion_matrix(y_true, y_pred)
-    out_png = ART / f"confusion_{split}.png"
-    plot_confusion(cm, out_png)
-    print(f"[ASSET] Saved confusion matrix -> {out_png}")
+    if plot:
+        cm = confusion_matrix(y_true, y_pred)
+        out_png = ART / f"confusion_{split}.png"
+        plot_confusion(cm, out_png)
+        print(f"[ASSET] Saved confusion matrix -> {out_png}")
+
+    t0 = time.perf_counter()
+    overall = evaluate(y_proba, y_true, t, n_boot=n_boot)
+    print(
+        f"[METRIC] macro-F1 ({split}): {_fmt(overall, 'macro_f1')} "
+        f"| ROC-AUC: {_fmt(overall, 'roc_auc')}"
+        + (f" | 95% CI, {n_boot} resamples" if n_boot else "")
+    )
+
+    rows = []
+    for by in slices:
+        rows += slice_metrics(df, y_proba, by, t, n_boot=n_boot)
+    if rows:
+        print(
+            f"\n{'slice':<8} {'value':<16} {'n':>7} {'pos':>6} {'macro_f1':>26} {'roc_auc':>26}"
+        )
+        for r in rows:
+            print(
+                f"{r['slice']:<8} {r['value']:<16} {r['n']:>7} {r['pos_rate']:>6.3f} "
+                f"{_fmt(r, 'macro_f1'):>26} {_fmt(r, 'roc_auc'):>26}"
+            )
+    print(f"[TIME] metrics + bootstrap {time.perf_counter() - t0:.2f}s")
+
+    if json_out:
+        report = {
+            "model_file": meta["model_file"],
+            "split": split,
+            "extra": [str(p) for p in extra],
+            "threshold": t,
+            "n_boot": n_boot,
+            "overall": overall,
+            "slices": rows,
+        }
+        text = json.dumps(_nan_to_none(report), indent=2, allow_nan=False)
+        Path(json_out).write_text(text, encoding="utf-8")
+        print(f"[ASSET] Saved metrics -> {json_out}")
 
-    try:
-        y_proba = model.predict_proba(df["text"])[:, 1]
-        roc_auc = roc_auc_score(y_true, y_proba)
-        print(f"[METRIC] ROC-AUC ({split}): {roc_auc:.4f}")
-    except Exception as e:
-        print("[WARN] ROC-AUC not available:", e)
+    if compare:
+        entries = [(_resolve_model_file(str(meta["model_file"])), clean)]
+        entries += [compare_entry(c, clean) for c in compare]
+        compare_models(entries, df, t)
 
 
 if __name__ == "__main__":
@@ -63,5 +285,36 @@ if __name__ == "__main__":
 
     p = argparse.ArgumentParser()
     p.add_argument("--split", choices=["val", "test"], default="test")
+    p.add_argument(
+        "--compare",
+        nargs="+",
+        default=(),
+        metavar="MODEL",
+        help="extra models to compare against the current one: a metadata .json "
+        "(its own clean_text setting) or a .joblib (current model's setting)",
+    )
+    p.add_argument(
+        "--extra",
+        nargs="+",
+        default=(),
+        metavar="CSV",
+        help="extra labelled sets (e.g. feedback holdout), each reported as a source",
+    )
+    p.add_argument("--slices", nargs="*", choices=SLICES, default=list(SLICES))
+    p.add_argument("--bootstrap", type=int, default=1000, help="resamples, 0 = off")
+    p.add_argument("--threshold", default="0.5", help="float or 'meta'")
+    p.add_argument("--n-jobs", type=int, default=-1)
+    p.add_argument("--no-plot", action="store_true")
+    p.add_argument("--json", help="write the metrics report to this path")
     args = p.parse_args()
-    main(split=args.split)
+    main(
+        split=args.split,
+        compare=args.compare,
+        extra=args.extra,
+        slices=args.slices,
+        n_boot=args.bootstrap,
+        threshold=args.threshold,
+        n_jobs=args.n_jobs,
+        plot=not args.no_plot,
+        json_out=args.json,
+    )
@@ -0,0 +1,98 @@
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+try:
+    from app.engine import HashedLinearScorer, compile_pipeline, load_mmap, save_mmap
+    from app.predict import _resolve_model_file
+except Exception:
+    import sys
+
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+    from app.engine import HashedLinearScorer, compile_pipeline, load_mmap, save_mmap
+    from app.predict import _resolve_model_file
+
+from dataset import load_split, uses_clean
+
+MODELS = Path("models")
+PARITY_TOL = 1e-9
+
+
+def _latency_us(fn, texts, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for t in texts:
+            fn(t)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(texts) * 1e6
+
+
+def main(split="test", fmt="joblib", update_meta=True):
+    meta_path = MODELS / "metadata.json"
+    meta = json.load(open(meta_path, encoding="utf-8"))
+    model_file = _resolve_model_file(str(meta["model_file"]))
+    pipe = joblib.load(model_file)
+    engine = compile_pipeline(pipe, source=model_file.as_posix())
+    if fmt == "mmap" and isinstance(engine, HashedLinearScorer):
+        raise SystemExit(
+            "[ERROR] --format mmap indexes a vocabulary; hashing models have none "
+            "(already dense idf/weight arrays) - use --format joblib"
+        )
+
+    clean = uses_clean(meta)
+    df = load_split(split, clean=clean)
+    texts = df["clean" if clean else "text"].tolist()
+
+    diff = float(
+        np.abs(
+            engine.predict_proba(texts)[:, 1] - pipe.predict_proba(texts)[:, 1]
+        ).max()
+    )
+    print(f"[PARITY] max |p_engine - p_sklearn| on {split}: {diff:.3e}")
+    if diff > PARITY_TOL:
+        raise SystemExit(f"[ERROR] parity check failed (> {PARITY_TOL})")
+
+    t_sk = _latency_us(lambda t: pipe.predict_proba([t]), texts)
+    t_en = _latency_us(engine.score, texts)
+    print(
+        f"[LATENCY] sklearn={t_sk:.1f}us/text | engine={t_en:.1f}us/text "
+        f"| speedup={t_sk / t_en:.1f}x"
+    )
+
+    if fmt == "mmap":
+        engine_path = save_mmap(engine, model_file.with_name(f"{model_file.stem}.mmap"))
+        reloaded = load_mmap(engine_path)
+        diff = float(
+            np.abs(reloaded.predict_proba(texts) - engine.predict_proba(texts)).max()
+        )
+        if diff > PARITY_TOL:
+            raise SystemExit(f"[ERROR] mmap artifact parity check failed: {diff:.3e}")
+        meta_key = "mmap_dir"
+    else:
+        engine_path = model_file.with_name(f"{model_file.stem}.engine.joblib")
+        joblib.dump(engine, engine_path)
+        meta_key = "engine_file"
+    print(f"[SAVED] {engine_path} ({len(engine)} terms)")
+
+    if update_meta:
+        meta[meta_key] = engine_path.as_posix()
+        tmp_meta = meta_path.with_suffix(".json.tmp")
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_meta, meta_path)
+        print(f"[META UPDATED] {meta_key} saved.")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--split", choices=["val", "test"], default="test")
+    p.add_argument("--format", choices=["joblib", "mmap"], default="joblib")
+    p.add_argument("--no-update-meta", action="store_true")
+    args = p.parse_args()
+    main(split=args.split, fmt=args.format, update_meta=not args.no_update_meta)
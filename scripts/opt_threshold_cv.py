@@ -1,46 +1,135 @@
+import argparse
 import json
+import os
 from pathlib import Path
 
 import joblib
 import numpy as np
-import pandas as pd
-from sklearn.metrics import f1_score
+from joblib import Parallel, delayed
+from sklearn.base import clone
 from sklearn.model_selection import StratifiedKFold
 
-DATA = Path("data/processed")
+try:
+    from app.predict import _resolve_model_file
+except Exception:
+    import sys
+
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+    from app.predict import _resolve_model_file
+
+from dataset import load_split, uses_clean
+from thresholds import OBJECTIVES, candidate_thresholds, metrics_at, select_threshold
+
 MODELS = Path("models")
+GRID = np.linspace(0.2, 0.8, 61)
 
 
-def main(k=5):
-    tr = pd.read_csv(DATA / "train.csv")
-    X = tr["text"].astype(str).values
-    y = tr["label"].values
+def _fold_proba(template, X, y, train_idx, val_idx):
+    model = clone(template).fit(X[train_idx], y[train_idx])
+    return model.predict_proba(X[val_idx])[:, 1]
+
 
+def oof_probas(model, X, y, k=5, refit=True, n_jobs=-1):
+    skf = StratifiedKFold(n_splits=k, shuffle=True, random_state=42)
+    folds = list(skf.split(X, y))
+    if refit:
+        probas = Parallel(n_jobs=n_jobs)(
+            delayed(_fold_proba)(model, X, y, tr, va) for tr, va in folds
+        )
+    else:
+        probas = [model.predict_proba(X[va])[:, 1] for _, va in folds]
+    return [(p, y[va]) for p, (_, va) in zip(probas, folds)]
+
+
+def main(
+    k=5,
+    objective="f1",
+    target=None,
+    cost_fp=1.0,
+    cost_fn=1.0,
+    candidates="grid",
+    refit=True,
+    n_jobs=-1,
+):
     meta_path = MODELS / "metadata.json"
     meta = json.load(open(meta_path, encoding="utf-8"))
-    model = joblib.load(meta["model_file"])
+    model = joblib.load(_resolve_model_file(str(meta["model_file"])))
 
-    skf = StratifiedKFold(n_splits=k, shuffle=True, random_state=42)
-    ts = np.linspace(0.2, 0.8, 61)
-    f1s = np.zeros_like(ts, dtype=float)
+    clean = uses_clean(meta)
+    tr = load_split("train", clean=clean)
+    X = tr["clean" if clean else "text"].astype(str).values
+    y = tr["label"].values
+
+    folds = oof_probas(model, X, y, k=k, refit=refit, n_jobs=n_jobs)
+    grid = GRID if candidates == "grid" else None
+    ts = candidate_thresholds(np.concatenate([p for p, _ in folds]), grid)
 
-    for _, val_idx in skf.split(X, y):
-        proba = model.predict_proba(X[val_idx])[:, 1]
-        yv = y[val_idx]
-        for i, t in enumerate(ts):
-            pred = (proba >= t).astype(int)
-            f1s[i] += f1_score(yv, pred, average="macro")
+    curves = {}
+    for proba, yv in folds:
+        for name, values in metrics_at(proba, yv, ts).items():
+            curves[name] = curves.get(name, 0.0) + values / len(folds)
 
-    f1s /= k
-    best_i = int(np.argmax(f1s))
-    best_t, best_f1 = float(ts[best_i]), float(f1s[best_i])
-    print(f"[CV THRESHOLD] t={best_t:.3f} | mean macro-F1={best_f1:.4f}")
+    best_t, best_score = select_threshold(
+        curves, ts, objective, target=target, cost_fp=cost_fp, cost_fn=cost_fn
+    )
+    i = int(np.searchsorted(ts, best_t))
+    print(
+        f"[CV THRESHOLD] t={best_t:.4f} | {objective} score={best_score:.4f} "
+        f"| mean macro-F1={curves['macro_f1'][i]:.4f} "
+        f"| precision={curves['precision'][i]:.4f} | recall={curves['recall'][i]:.4f} "
+        f"| candidates={len(ts)} | refit={refit}"
+    )
 
     meta["threshold"] = best_t
-    with open(meta_path, "w", encoding="utf-8") as f:
+    meta["threshold_cv"] = {
+        "objective": objective,
+        "target": target,
+        "cost_fp": cost_fp,
+        "cost_fn": cost_fn,
+        "k": k,
+        "candidates": candidates,
+        "refit": refit,
+        "score": best_score,
+    }
+    tmp_meta = meta_path.with_suffix(".json.tmp")
+    with open(tmp_meta, "w", encoding="utf-8") as f:
         json.dump(meta, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_meta, meta_path)
     print("[META UPDATED] threshold saved.")
 
 
 if __name__ == "__main__":
-    main()
+    p = argparse.ArgumentParser()
+    p.add_argument("--k", type=int, default=5)
+    p.add_argument("--objective", choices=OBJECTIVES, default="f1")
+    p.add_argument(
+        "--target",
+        type=float,
+        default=None,
+        help="minimum precision (objective=precision) or recall (objective=recall)",
+    )
+    p.add_argument("--cost-fp", type=float, default=1.0)
+    p.add_argument("--cost-fn", type=float, default=1.0)
+    p.add_argument(
+        "--candidates",
+        choices=["grid", "unique"],
+        default="grid",
+        help="grid: 0.2..0.8 step 0.01; unique: every distinct out-of-fold probability",
+    )
+    p.add_argument(
+        "--no-refit",
+        action="store_true",
+        help="score folds with the already trained model (faster, optimistic)",
+    )
+    p.add_argument("--n-jobs", type=int, default=-1)
+    args = p.parse_args()
+    main(
+        k=args.k,
+        objective=args.objective,
+        target=args.target,
+        cost_fp=args.cost_fp,
+        cost_fn=args.cost_fn,
+        candidates=args.candidates,
+        refit=not args.no_refit,
+        n_jobs=args.n_jobs,
+    )
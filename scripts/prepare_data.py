@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import argparse
 import hashlib
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Tuple
 
@@ -11,12 +13,14 @@ import pandas as pd
 from sklearn.model_selection import GroupShuffleSplit, StratifiedShuffleSplit
 
 try:
-    from app.utils import clean_text
+    from app.utils import clean_text, hash_group
 except Exception:
     import sys
 
     sys.path.append(str(Path(__file__).resolve().parents[1]))
-    from app.utils import clean_text
+    from app.utils import clean_text, hash_group
+
+from dataset import columnar_path, write_columnar
 
 RAW = Path("data/raw")
 OUT = Path("data/processed")
@@ -25,18 +29,7 @@ OUT.mkdir(parents=True, exist_ok=True)
 DEFAULT_VAL_SIZE = 0.15
 DEFAULT_TEST_SIZE = 0.15
 DEFAULT_SEED = 42
-
-
-def _norm_text(s: str) -> str:
-    if not isinstance(s, str):
-        s = str(s) if s is not None else ""
-    s = s.replace("\r", " ").replace("\n", " ")
-    s = " ".join(s.split()).lower()
-    return s
-
-
-def _hash_group(s: str) -> str:
-    return hashlib.sha1(_norm_text(s).encode("utf-8")).hexdigest()
+DEFAULT_CHUNK_SIZE = 10_000
 
 
 def _load_jigsaw_if_exists(limit: int | None = 20000) -> pd.DataFrame | None:
@@ -124,7 +117,7 @@ def group_split(df, val_size: float, test_size: float, seed: int):
         raise ValueError("val_size и test_size должны быть в (0, 0.5).")
 
     df = df.copy()
-    df["__group"] = df["text"].map(_hash_group)
+    df["__group"] = df["text"].map(hash_group)
 
     gss1 = GroupShuffleSplit(
         n_splits=1, test_size=(val_size + test_size), random_state=seed
@@ -145,23 +138,59 @@ def group_split(df, val_size: float, test_size: float, seed: int):
     return train_df, val_df, test_df
 
 
+def _prepare_chunk(texts: list[str]) -> list[tuple[str, bytes, str]]:
+    out = []
+    for t in texts:
+        clean = clean_text(t)
+        out.append((clean, hashlib.sha1(clean.encode("utf-8")).digest(), hash_group(t)))
+    return out
+
+
+def dedup_parallel(
+    df: pd.DataFrame, workers: int, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> pd.DataFrame:
+    # Same rows as drop_duplicates(clean_text(text), keep="first"): chunks come
+    # back in submission order and a running digest set keeps first occurrences.
+    texts = df["text"].tolist()
+    chunks = (texts[i : i + chunk_size] for i in range(0, len(texts), chunk_size))
+    keep = np.zeros(len(texts), dtype=bool)
+    cleaned: list[str] = []
+    groups: list[str] = []
+    seen: set[bytes] = set()
+    pos = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for rows in pool.map(_prepare_chunk, chunks):
+            for clean, key, group in rows:
+                if key not in seen:
+                    seen.add(key)
+                    keep[pos] = True
+                    cleaned.append(clean)
+                    groups.append(group)
+                pos += 1
+    out = df[keep].reset_index(drop=True)
+    out["clean"] = cleaned
+    out["group"] = groups
+    return out
+
+
 def main(
     val_size: float = DEFAULT_VAL_SIZE,
     test_size: float = DEFAULT_TEST_SIZE,
     seed: int = DEFAULT_SEED,
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
 ):
     print("=== PREPARE DATA ===")
     print("RAW:", RAW)
     print("OUT:", OUT)
     df = load_sources()
 
-    df["norm"] = df["text"].map(clean_text)
     before = len(df)
-    df = (
-        df.drop_duplicates(subset=["norm"])
-        .drop(columns=["norm"])
-        .reset_index(drop=True)
-    )
+    if workers > 1:
+        df = dedup_parallel(df, workers, chunk_size)
+    else:
+        df["clean"] = df["text"].map(clean_text)
+        df = df.drop_duplicates(subset=["clean"]).reset_index(drop=True)
     print(f"[DEDUP] exact duplicates removed: {before - len(df)} | remain: {len(df)}")
 
     y = df["label"].values
@@ -187,9 +216,14 @@ def main(
             f"{name:>5}: n={n:4d} | pos={pos:4d} | neg={n-pos:4d} | pos_ratio={pos/n: .3f}"
         )
 
-    train_df.to_csv(OUT / "train.csv", index=False)
-    val_df.to_csv(OUT / "val.csv", index=False)
-    test_df.to_csv(OUT / "test.csv", index=False)
+    for name, d in [("train", train_df), ("val", val_df), ("test", test_df)]:
+        d[["text", "label"]].to_csv(
+            OUT / f"{name}.csv", index=False, chunksize=chunk_size
+        )
+        if write_columnar(d, columnar_path(name, OUT)):
+            print(f"[COLUMNAR] {columnar_path(name, OUT)}")
+        else:
+            columnar_path(name, OUT).unlink(missing_ok=True)
     print("Saved train/val/test.")
 
 
@@ -198,9 +232,22 @@ if __name__ == "__main__":
     parser.add_argument("--val_size", type=float, default=DEFAULT_VAL_SIZE)
     parser.add_argument("--test_size", type=float, default=DEFAULT_TEST_SIZE)
     parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="processes for clean_text + hashing (0 = all cores)",
+    )
+    parser.add_argument("--chunk_size", type=int, default=DEFAULT_CHUNK_SIZE)
     args = parser.parse_args()
     try:
-        main(val_size=args.val_size, test_size=args.test_size, seed=args.seed)
+        main(
+            val_size=args.val_size,
+            test_size=args.test_size,
+            seed=args.seed,
+            workers=args.workers or os.cpu_count() or 1,
+            chunk_size=args.chunk_size,
+        )
     except Exception as e:
         print("[ERROR]", e, file=sys.stderr)
         sys.exit(1)
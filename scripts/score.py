@@ -0,0 +1,199 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    from app import predict
+except Exception:
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+    from app import predict
+
+OUTPUT_COLUMNS = ["id", "label", "prob", "low_confidence", "model_version"]
+
+
+def _init_worker():
+    predict.load_model()
+
+
+def _score_chunk(texts: list[str]) -> tuple[str, list[dict]]:
+    # Same preprocessing / threshold / low-confidence rules as predict_one,
+    # without the request caches.
+    state = predict.current_state()
+    return state.version, predict.score_texts(texts, state)
+
+
+def iter_input(args, chunk_size: int):
+    if args.db_query:
+        from app.db import engine
+
+        return pd.read_sql_query(args.db_query, engine, chunksize=chunk_size)
+    src = sys.stdin if args.input in (None, "-") else args.input
+    fmt = args.format
+    if fmt is None:
+        fmt = "jsonl" if str(args.input).endswith((".jsonl", ".ndjson")) else "csv"
+    if fmt == "jsonl":
+        return pd.read_json(src, lines=True, chunksize=chunk_size, dtype=False)
+    return pd.read_csv(src, chunksize=chunk_size, dtype={args.text_col: str})
+
+
+def iter_batches(chunks, text_col: str, id_col: str, skip: int):
+    start = 0
+    for chunk in chunks:
+        end = start + len(chunk)
+        if end > skip:
+            chunk = chunk.iloc[max(skip - start, 0) :]
+            ids = (
+                chunk[id_col].tolist()
+                if id_col in chunk
+                else list(range(end - len(chunk), end))
+            )
+            texts = chunk[text_col].fillna("").astype(str).tolist()
+            yield ids, texts
+        start = end
+
+
+def iter_scored(batches, pool, depth: int):
+    if pool is None:
+        for ids, texts in batches:
+            version, results = _score_chunk(texts)
+            yield ids, version, results
+        return
+    # Bounded read-ahead keeps memory flat; results are yielded in input order
+    # so the checkpoint is a simple row/byte offset.
+    pending = deque()
+    for ids, texts in batches:
+        pending.append((ids, pool.submit(_score_chunk, texts)))
+        if len(pending) >= depth:
+            ids, future = pending.popleft()
+            version, results = future.result()
+            yield ids, version, results
+    while pending:
+        ids, future = pending.popleft()
+        version, results = future.result()
+        yield ids, version, results
+
+
+def format_rows(ids, results, version: str, fmt: str, header: bool) -> bytes:
+    df = pd.DataFrame(results)
+    df.insert(0, "id", ids)
+    df["model_version"] = version
+    df = df[OUTPUT_COLUMNS]
+    if fmt == "jsonl":
+        lines = (
+            json.dumps(row, ensure_ascii=False, default=str)
+            for row in df.to_dict(orient="records")
+        )
+        return "".join(line + "\n" for line in lines).encode("utf-8")
+    return df.to_csv(index=False, header=header).encode("utf-8")
+
+
+def read_checkpoint(path: Path) -> dict:
+    if not path.exists():
+        return {"rows_done": 0, "output_bytes": 0}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def write_checkpoint(path: Path, state: dict):
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(state), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def main(args):
+    out_path = Path(args.output)
+    out_fmt = "jsonl" if out_path.suffix in (".jsonl", ".ndjson") else "csv"
+    ckpt_path = out_path.with_name(out_path.name + ".ckpt.json")
+
+    ckpt = {"rows_done": 0, "output_bytes": 0}
+    if args.resume:
+        ckpt = read_checkpoint(ckpt_path)
+    elif ckpt_path.exists():
+        raise SystemExit(f"{ckpt_path} exists: pass --resume or remove it")
+    if out_path.exists() and ckpt["output_bytes"]:
+        # Drop anything written after the last checkpoint (partial chunk).
+        with open(out_path, "r+b") as f:
+            f.truncate(ckpt["output_bytes"])
+    elif out_path.exists():
+        out_path.unlink()
+    if ckpt["rows_done"]:
+        print(f"[RESUME] skipping {ckpt['rows_done']} rows already scored")
+
+    batches = iter_batches(
+        iter_input(args, args.chunk_size), args.text_col, args.id_col, ckpt["rows_done"]
+    )
+    workers = args.workers if args.workers >= 0 else os.cpu_count() or 1
+
+    if workers == 0:
+        _init_worker()
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+    t0 = last_report = time.perf_counter()
+    scored = 0
+    try:
+        with open(out_path, "ab") as out:
+            for ids, version, results in iter_scored(batches, pool, 2 * workers):
+                expected = ckpt.get("model_version")
+                if expected and version != expected:
+                    raise SystemExit(
+                        f"Model changed since checkpoint ({expected} -> {version}); "
+                        "start a fresh run"
+                    )
+                out.write(
+                    format_rows(ids, results, version, out_fmt, header=out.tell() == 0)
+                )
+                out.flush()
+                os.fsync(out.fileno())
+                scored += len(ids)
+                ckpt = {
+                    "rows_done": ckpt["rows_done"] + len(ids),
+                    "output_bytes": out.tell(),
+                    "model_version": version,
+                }
+                write_checkpoint(ckpt_path, ckpt)
+
+                now = time.perf_counter()
+                if now - last_report >= args.progress_sec:
+                    print(
+                        f"[PROGRESS] rows={ckpt['rows_done']} "
+                        f"rate={scored / (now - t0):.0f} rows/s",
+                        file=sys.stderr,
+                        flush=True,
+                    )
+                    last_report = now
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    ckpt_path.unlink(missing_ok=True)
+    elapsed = time.perf_counter() - t0
+    print(
+        f"[DONE] scored={scored} total={ckpt['rows_done']} in {elapsed:.1f}s "
+        f"({scored / max(elapsed, 1e-9):.0f} rows/s) -> {out_path}"
+    )
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    src = p.add_mutually_exclusive_group()
+    src.add_argument("--input", help="CSV/JSONL file, '-' or omitted for stdin")
+    src.add_argument("--db-query", help="SQL query run against DATABASE_URL")
+    p.add_argument("--format", choices=["csv", "jsonl"], help="input format")
+    p.add_argument("--text-col", default="text")
+    p.add_argument("--id-col", default="id")
+    p.add_argument("--output", required=True, help="output .csv or .jsonl")
+    p.add_argument("--chunk-size", type=int, default=10000)
+    p.add_argument(
+        "--workers", type=int, default=-1, help="-1 = all cores, 0 = in-process"
+    )
+    p.add_argument("--resume", action="store_true")
+    p.add_argument("--progress-sec", type=float, default=5.0)
+    main(p.parse_args())
@@ -0,0 +1,87 @@
+import numpy as np
+
+OBJECTIVES = ("f1", "precision", "recall", "cost")
+
+
+def confusion_at(proba, y, thresholds) -> dict[str, np.ndarray]:
+    # Counts for pred = proba >= t at every t: one sort, one cumsum, one
+    # searchsorted, instead of a full f1_score call per threshold.
+    proba = np.asarray(proba, dtype=np.float64)
+    y = np.asarray(y).astype(bool)
+    order = np.argsort(proba, kind="stable")
+    p_sorted = proba[order]
+    pos_below = np.concatenate([[0], np.cumsum(y[order])])
+    n_pos = int(pos_below[-1])
+    n_neg = len(y) - n_pos
+
+    idx = np.searchsorted(p_sorted, np.asarray(thresholds, dtype=np.float64))
+    fn = pos_below[idx]
+    tn = idx - fn
+    return {"tp": n_pos - fn, "fp": n_neg - tn, "fn": fn, "tn": tn}
+
+
+def ratio(num, den) -> np.ndarray:
+    num = np.asarray(num, dtype=np.float64)
+    den = np.asarray(den, dtype=np.float64)
+    return np.divide(num, den, out=np.zeros_like(num), where=den > 0)
+
+
+def macro_f1(tp, fp, fn, tn) -> np.ndarray:
+    # Like f1_score(average="macro"): a class counts only if it occurs in y or
+    # pred, so single-class folds are not halved; NaN for empty inputs.
+    den_pos = np.asarray(2 * tp + fp + fn, dtype=np.float64)
+    den_neg = np.asarray(2 * tn + fn + fp, dtype=np.float64)
+    present = (den_pos > 0).astype(np.float64) + (den_neg > 0)
+    total = ratio(2 * tp, den_pos) + ratio(2 * tn, den_neg)
+    return np.divide(
+        total, present, out=np.full(total.shape, np.nan), where=present > 0
+    )
+
+
+def metrics_at(proba, y, thresholds) -> dict[str, np.ndarray]:
+    c = confusion_at(proba, y, thresholds)
+    tp, fp, fn, tn = c["tp"], c["fp"], c["fn"], c["tn"]
+    return {
+        **c,
+        "precision": ratio(tp, tp + fp),
+        "recall": ratio(tp, tp + fn),
+        "macro_f1": macro_f1(tp, fp, fn, tn),
+        "n": np.full(len(tp), len(np.asarray(y)), dtype=np.int64),
+    }
+
+
+def candidate_thresholds(proba, grid=None) -> np.ndarray:
+    if grid is not None:
+        return np.asarray(grid, dtype=np.float64)
+    return np.unique(np.asarray(proba, dtype=np.float64))
+
+
+def select_threshold(
+    curves: dict[str, np.ndarray],
+    thresholds: np.ndarray,
+    objective: str = "f1",
+    target: float | None = None,
+    cost_fp: float = 1.0,
+    cost_fn: float = 1.0,
+) -> tuple[float, float]:
+    # Returns (threshold, objective value); ties go to the lowest threshold,
+    # matching argmax over an ascending grid.
+    if objective == "f1":
+        score = curves["macro_f1"]
+    elif objective in ("precision", "recall"):
+        if target is None:
+            raise ValueError(f"objective={objective} needs a target")
+        # precision target: maximize recall subject to precision >= target,
+        # recall target: maximize precision subject to recall >= target.
+        other = "recall" if objective == "precision" else "precision"
+        feasible = curves[objective] >= target
+        if not feasible.any():
+            raise ValueError(f"No threshold reaches {objective} >= {target}")
+        score = np.where(feasible, curves[other], -np.inf)
+    elif objective == "cost":
+        score = -(cost_fp * curves["fp"] + cost_fn * curves["fn"]) / curves["n"]
+    else:
+        raise ValueError(f"objective must be one of {OBJECTIVES}")
+    best = int(np.argmax(score))
+    value = float(score[best])
+    return float(thresholds[best]), -value if objective == "cost" else value
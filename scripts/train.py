@@ -1,37 +1,77 @@
 import json
+import os
 import time
 from datetime import datetime
 from pathlib import Path
 
 import joblib
+import numpy as np
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+from sklearn.feature_extraction.text import (
+    HashingVectorizer,
+    TfidfTransformer,
+    TfidfVectorizer,
+)
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.metrics import f1_score
 from sklearn.pipeline import Pipeline
 
+from dataset import load_split
+
 DATA = Path("data/processed")
 MODELS = Path("models")
 MODELS.mkdir(exist_ok=True)
 
+VECTORIZERS = ("tfidf", "hashing")
+HASH_BITS = 20
+STREAM_CHUNK_SIZE = 50_000
+STREAM_EPOCHS = 5
+STREAM_ALPHA = 1e-5
+# Headerless feedback logs (data/feedback.csv): timestamp,text,label
+FEEDBACK_COLUMNS = ["timestamp", "text", "label"]
+
 
 def load_data():
-    train = pd.read_csv(DATA / "train.csv")
-    val = pd.read_csv(DATA / "val.csv")
-    train["text"] = train["text"].astype(str)
-    val["text"] = val["text"].astype(str)
-    return train, val
+    return load_split("train"), load_split("val")
 
 
-def build_pipeline():
-    return Pipeline(
-        steps=[
+def build_features(vectorizer="tfidf", n_bits=HASH_BITS):
+    if vectorizer == "hashing":
+        return [
             (
-                "tfidf",
-                TfidfVectorizer(
-                    ngram_range=(1, 2), max_features=100_000, lowercase=True
+                "hash",
+                HashingVectorizer(
+                    ngram_range=(1, 2),
+                    n_features=2**n_bits,
+                    alternate_sign=False,
+                    norm=None,
+                    lowercase=True,
                 ),
             ),
+            ("tfidf", TfidfTransformer()),
+        ]
+    return [
+        (
+            "tfidf",
+            TfidfVectorizer(ngram_range=(1, 2), max_features=100_000, lowercase=True),
+        )
+    ]
+
+
+def features_meta(vectorizer="tfidf", n_bits=HASH_BITS) -> dict:
+    if vectorizer == "hashing":
+        return {
+            "features": f"hashing(1,2),n_features=2^{n_bits}+tfidf",
+            "vectorizer": "hashing",
+            "n_features_bits": n_bits,
+        }
+    return {"features": "tfidf(1,2),max_features=100k", "vectorizer": "tfidf"}
+
+
+def build_pipeline(vectorizer="tfidf", n_bits=HASH_BITS):
+    return Pipeline(
+        steps=[
+            *build_features(vectorizer, n_bits),
             (
                 "clf",
                 LogisticRegression(
@@ -45,12 +85,119 @@ def build_pipeline():
     )
 
 
-def main():
+def iter_chunks(paths, chunk_size=STREAM_CHUNK_SIZE):
+    for path in paths:
+        header = pd.read_csv(path, nrows=0).columns
+        text_col = next((c for c in ("text", "comment_text") if c in header), None)
+        label_col = next((c for c in ("label", "toxic") if c in header), None)
+        if text_col and label_col:
+            kw = {"usecols": [text_col, label_col]}
+        else:
+            text_col, label_col = "text", "label"
+            kw = {"header": None, "names": FEEDBACK_COLUMNS}
+        for chunk in pd.read_csv(path, chunksize=chunk_size, **kw):
+            chunk = chunk.dropna(subset=[text_col, label_col])
+            if len(chunk):
+                yield (
+                    chunk[text_col].astype(str),
+                    (chunk[label_col].astype(float) >= 1).astype(int).values,
+                )
+
+
+def fit_idf(hasher, paths, chunk_size=STREAM_CHUNK_SIZE):
+    doc_freq = np.zeros(hasher.n_features, dtype=np.int64)
+    class_counts = np.zeros(2, dtype=np.int64)
+    n_docs = 0
+    for texts, y in iter_chunks(paths, chunk_size):
+        X = hasher.transform(texts)
+        doc_freq += np.bincount(X.indices, minlength=hasher.n_features)
+        class_counts += np.bincount(y, minlength=2)
+        n_docs += X.shape[0]
+    if not n_docs:
+        raise ValueError(f"No training rows in {[str(p) for p in paths]}")
+
+    tfidf = TfidfTransformer()
+    tfidf.idf_ = np.log((1 + n_docs) / (1 + doc_freq)) + 1.0
+    tfidf.n_features_in_ = hasher.n_features
+    class_weight = {
+        c: n_docs / (2 * count) for c, count in enumerate(class_counts) if count
+    }
+    return tfidf, class_weight, n_docs
+
+
+def stream_f1(pipe, paths, chunk_size=STREAM_CHUNK_SIZE) -> float:
+    y_true, y_pred = [], []
+    for texts, y in iter_chunks(paths, chunk_size):
+        y_true.append(y)
+        y_pred.append(pipe.predict(texts))
+    return f1_score(np.concatenate(y_true), np.concatenate(y_pred), average="macro")
+
+
+def main_stream(
+    sources,
+    val_path=DATA / "val.csv",
+    n_bits=HASH_BITS,
+    epochs=STREAM_EPOCHS,
+    chunk_size=STREAM_CHUNK_SIZE,
+    alpha=STREAM_ALPHA,
+):
+    if epochs < 1:
+        raise ValueError("epochs must be >= 1")
+    (_, hasher), _ = build_features("hashing", n_bits)
+    rng = np.random.default_rng(42)
+
+    t0 = time.perf_counter()
+    tfidf, class_weight, n_rows = fit_idf(hasher, sources, chunk_size)
+    clf = SGDClassifier(
+        loss="log_loss", alpha=alpha, class_weight=class_weight, random_state=42
+    )
+    pipe = Pipeline(steps=[("hash", hasher), ("tfidf", tfidf), ("clf", clf)])
+
+    for epoch in range(1, epochs + 1):
+        for texts, y in iter_chunks(sources, chunk_size):
+            order = rng.permutation(len(y))
+            X = tfidf.transform(hasher.transform(texts.iloc[order]))
+            clf.partial_fit(X, y[order], classes=[0, 1])
+        macro_f1 = stream_f1(pipe, [val_path], chunk_size)
+        print(f"[EPOCH {epoch}/{epochs}] val macro-F1: {macro_f1:.4f}")
+    train_time = time.perf_counter() - t0
+
+    ts = datetime.now().strftime("%Y%m%d_%H%M")
+    model_path = MODELS / f"model_{ts}.joblib"
+    joblib.dump(pipe, model_path)
+
+    meta = {
+        "created": ts,
+        "model_file": model_path.as_posix(),
+        **features_meta("hashing", n_bits),
+        "clf": f"sgd(log_loss,alpha={alpha},class_weight=balanced)",
+        "training": {
+            "mode": "stream",
+            "sources": [Path(p).as_posix() for p in sources],
+            "epochs": epochs,
+            "chunk_size": chunk_size,
+        },
+        "split": {"train": n_rows},
+        "val_macro_f1": float(macro_f1),
+        "train_time_sec": round(train_time, 3),
+        "random_state": 42,
+    }
+    meta_path = MODELS / "metadata.json"
+    tmp_meta = meta_path.with_suffix(".json.tmp")
+    with open(tmp_meta, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_meta, meta_path)
+
+    print(f"[OK] Saved model -> {model_path} (rows={n_rows})")
+    print(f"[METRIC] val macro-F1: {macro_f1:.4f} | train_time: {train_time:.2f}s")
+
+
+def main(vectorizer="tfidf", n_bits=HASH_BITS):
     train_df, val_df = load_data()
     Xtr, ytr = train_df["text"], train_df["label"]
     Xv, yv = val_df["text"], val_df["label"]
 
-    pipe = build_pipeline()
+    pipe = build_pipeline(vectorizer, n_bits)
 
     t0 = time.perf_counter()
     pipe.fit(Xtr, ytr)
@@ -66,19 +213,46 @@ def main():
     meta = {
         "created": ts,
         "model_file": model_path.as_posix(),
-        "features": "tfidf(1,2),max_features=100k",
+        **features_meta(vectorizer, n_bits),
         "clf": "logreg(class_weight=balanced,max_iter=1000)",
         "split": {"train": len(train_df), "val": len(val_df)},
         "val_macro_f1": float(macro_f1),
         "train_time_sec": round(train_time, 3),
         "random_state": 42,
     }
-    with open(MODELS / "metadata.json", "w", encoding="utf-8") as f:
+    meta_path = MODELS / "metadata.json"
+    tmp_meta = meta_path.with_suffix(".json.tmp")
+    with open(tmp_meta, "w", encoding="utf-8") as f:
         json.dump(meta, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_meta, meta_path)
 
     print(f"[OK] Saved model -> {model_path}")
     print(f"[METRIC] val macro-F1: {macro_f1:.4f} | train_time: {train_time:.2f}s")
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    p = argparse.ArgumentParser()
+    p.add_argument("--vectorizer", choices=VECTORIZERS, default="tfidf")
+    p.add_argument("--n-features-bits", type=int, default=HASH_BITS)
+    p.add_argument(
+        "--stream",
+        action="store_true",
+        help="out-of-core: hashing + SGD partial_fit over CSV chunks",
+    )
+    p.add_argument("--sources", nargs="+", default=[DATA / "train.csv"])
+    p.add_argument("--epochs", type=int, default=STREAM_EPOCHS)
+    p.add_argument("--chunk-size", type=int, default=STREAM_CHUNK_SIZE)
+    p.add_argument("--alpha", type=float, default=STREAM_ALPHA)
+    args = p.parse_args()
+    if args.stream:
+        main_stream(
+            sources=args.sources,
+            n_bits=args.n_features_bits,
+            epochs=args.epochs,
+            chunk_size=args.chunk_size,
+            alpha=args.alpha,
+        )
+    else:
+        main(vectorizer=args.vectorizer, n_bits=args.n_features_bits)
@@ -1,24 +1,28 @@
+import csv
 import json
+import os
+import sys
 from datetime import datetime
 from pathlib import Path
 
 import joblib
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
+from scipy.stats import loguniform
+from sklearn.feature_extraction.text import (
+    HashingVectorizer,
+    TfidfTransformer,
+    TfidfVectorizer,
+)
 from sklearn.linear_model import LogisticRegression
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
 from sklearn.metrics import f1_score
-from sklearn.model_selection import GridSearchCV
+from sklearn.model_selection import GridSearchCV, HalvingRandomSearchCV
 from sklearn.pipeline import Pipeline
 
-try:
-    from app.utils import clean_text
-except Exception:
-    import sys
+from budget_search import BudgetedRandomSearch
+from cached_search import CachedTfidfSearch
+from dataset import load_split
 
-    sys.path.append(str(Path(__file__).resolve().parents[1]))
-    from app.utils import clean_text
-
-DATA = Path("data/processed")
 MODELS = Path("models")
 MODELS.mkdir(exist_ok=True)
 
@@ -29,11 +33,60 @@ PARAM_GRID = {
     "clf__C": [0.5, 1.0, 2.0],
 }
 
+HASH_PARAM_GRID = {
+    "hash__ngram_range": [(1, 1), (1, 2)],
+    "tfidf__sublinear_tf": [False, True],
+    "clf__C": [0.5, 1.0, 2.0],
+}
+HASH_BITS = 20
 
-def build_pipeline():
+# Wider spaces for the budgeted modes (--search halving|random). Word n-grams
+# only: the compiled engine (export_engine.py, MODEL_ENGINE) has no char_wb.
+SEARCH_SPACE = {
+    "tfidf__ngram_range": [(1, 1), (1, 2), (1, 3), (2, 4), (3, 5)],
+    "tfidf__min_df": [1, 2, 3, 5],
+    "tfidf__max_df": [0.8, 0.9, 0.95, 1.0],
+    "tfidf__sublinear_tf": [False, True],
+    "clf__C": loguniform(1e-2, 1e2),
+}
+HASH_SEARCH_SPACE = {
+    "hash__ngram_range": [(1, 1), (1, 2), (1, 3), (2, 4), (3, 5)],
+    "tfidf__sublinear_tf": [False, True],
+    "clf__C": loguniform(1e-2, 1e2),
+}
+SEARCH_MODES = ("grid", "halving", "random")
+
+HISTORY_COLUMNS = [
+    "timestamp",
+    "val_macro_f1",
+    "best_params",
+    "search",
+    "trial",
+    "params",
+    "cv_macro_f1",
+    "n_samples",
+    "fold_time_sec",
+]
+
+
+def build_features(vectorizer="tfidf", n_bits=HASH_BITS):
+    if vectorizer == "hashing":
+        return [
+            (
+                "hash",
+                HashingVectorizer(
+                    n_features=2**n_bits, alternate_sign=False, norm=None
+                ),
+            ),
+            ("tfidf", TfidfTransformer()),
+        ]
+    return [("tfidf", TfidfVectorizer(max_features=50_000))]
+
+
+def build_pipeline(vectorizer="tfidf", n_bits=HASH_BITS):
     return Pipeline(
         [
-            ("tfidf", TfidfVectorizer(max_features=50_000)),
+            *build_features(vectorizer, n_bits),
             (
                 "clf",
                 LogisticRegression(
@@ -47,22 +100,134 @@ def build_pipeline():
     )
 
 
-def main():
-    train = pd.read_csv(DATA / "train.csv")
-    val = pd.read_csv(DATA / "val.csv")
+def _history_header(hist: Path):
+    if not hist.exists():
+        with open(hist, "w", encoding="utf-8", newline="") as h:
+            csv.writer(h).writerow(HISTORY_COLUMNS)
+        return
+    lines = hist.read_text(encoding="utf-8").splitlines()
+    if lines and lines[0] == ",".join(HISTORY_COLUMNS):
+        return
+    # Older files: timestamp,val_macro_f1,"<json>" with unescaped quotes.
+    # Rows are padded to the new columns and swapped in atomically.
+    rows = [HISTORY_COLUMNS]
+    pad = [""] * (len(HISTORY_COLUMNS) - 3)
+    for n, line in enumerate(lines[1:], start=2):
+        parts = line.split(",", 2)
+        if len(parts) < 3 or not parts[0].strip():
+            if line.strip():
+                print(
+                    f"[WARN] {hist}:{n}: skipping malformed history row",
+                    file=sys.stderr,
+                )
+            continue
+        ts, val_f1, params = parts
+        rows.append([ts, val_f1, params.strip('"'), *pad])
+    tmp = hist.with_suffix(".csv.tmp")
+    with open(tmp, "w", encoding="utf-8", newline="") as h:
+        csv.writer(h).writerows(rows)
+    os.replace(tmp, hist)
+
 
-    for df in (train, val):
-        df["text"] = df["text"].astype(str).map(clean_text)
-
-    pipe = build_pipeline()
-    gs = GridSearchCV(
-        pipe,
-        PARAM_GRID,
-        scoring="f1_macro",
-        cv=3,
-        n_jobs=-1,
-        verbose=1,
+def append_history(ts: str, val_f1: float, gs, search: str, n_samples: int):
+    hist = MODELS / "history.csv"
+    _history_header(hist)
+    res = gs.cv_results_
+    n_res = res.get("n_resources", [n_samples] * len(res["params"]))
+    rows = [
+        [
+            ts,
+            "",
+            "",
+            search,
+            i,
+            json.dumps(params, default=str),
+            f"{score:.5f}",
+            int(n),
+            f"{fit + score_t:.4f}",
+        ]
+        for i, (params, score, n, fit, score_t) in enumerate(
+            zip(
+                res["params"],
+                res["mean_test_score"],
+                n_res,
+                res["mean_fit_time"],
+                res["mean_score_time"],
+            )
+        )
+    ]
+    rows.append(
+        [
+            ts,
+            f"{val_f1:.5f}",
+            json.dumps(gs.best_params_, default=str),
+            search,
+            "best",
+            "",
+            f"{gs.best_score_:.5f}",
+            n_samples,
+            "",
+        ]
     )
+    with open(hist, "a", encoding="utf-8", newline="") as h:
+        csv.writer(h).writerows(rows)
+
+
+def main(
+    vectorizer="tfidf",
+    n_bits=HASH_BITS,
+    engine="cached",
+    search="grid",
+    budget=300.0,
+    n_candidates=64,
+    seed=42,
+):
+    train = load_split("train", clean=True)
+    val = load_split("val", clean=True)
+
+    for df in (train, val):
+        df["text"] = df["clean"]
+
+    pipe = build_pipeline(vectorizer, n_bits)
+    if engine == "cached" and vectorizer == "hashing":
+        print("[INFO] cached engine needs a vocabulary; using GridSearchCV")
+        engine = "grid"
+    space = HASH_SEARCH_SPACE if vectorizer == "hashing" else SEARCH_SPACE
+    if search == "halving":
+        gs = HalvingRandomSearchCV(
+            pipe,
+            space,
+            n_candidates=n_candidates,
+            factor=3,
+            resource="n_samples",
+            min_resources="exhaust",
+            scoring="f1_macro",
+            cv=3,
+            n_jobs=-1,
+            random_state=seed,
+            verbose=1,
+        )
+    elif search == "random":
+        gs = BudgetedRandomSearch(
+            pipe,
+            space,
+            budget_sec=budget,
+            max_trials=n_candidates,
+            cv=3,
+            random_state=seed,
+            verbose=1,
+        )
+    elif engine == "cached":
+        gs = CachedTfidfSearch(pipe, PARAM_GRID, cv=3, verbose=1)
+    else:
+        gs = GridSearchCV(
+            pipe,
+            HASH_PARAM_GRID if vectorizer == "hashing" else PARAM_GRID,
+            scoring="f1_macro",
+            cv=3,
+            n_jobs=-1,
+            verbose=1,
+        )
     gs.fit(train["text"], train["label"])
 
     best = gs.best_estimator_
@@ -81,22 +246,25 @@ def main():
     meta = {
         "created_at": ts,
         "model_file": str(model_path),
-        "features": "tfidf grid-tuned",
+        "features": f"{vectorizer} {search}-tuned",
+        "vectorizer": vectorizer,
         "best_params": gs.best_params_,
         "clf": "logreg(class_weight=balanced)",
         "val_macro_f1": float(val_f1),
         "cv": 3,
+        "search": search,
+        "search_engine": engine if search == "grid" else search,
         "notes": "clean_text applied; refit on train+val",
     }
-    with open(MODELS / "metadata.json", "w", encoding="utf-8") as f:
+    if vectorizer == "hashing":
+        meta["n_features_bits"] = n_bits
+    meta_path = MODELS / "metadata.json"
+    tmp_meta = meta_path.with_suffix(".json.tmp")
+    with open(tmp_meta, "w", encoding="utf-8") as f:
         json.dump(meta, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_meta, meta_path)
 
-    hist = MODELS / "history.csv"
-    line = f'{ts},{val_f1:.5f},"{json.dumps(gs.best_params_)}"\n'
-    if not hist.exists():
-        hist.write_text("timestamp,val_macro_f1,best_params\n", encoding="utf-8")
-    with open(hist, "a", encoding="utf-8") as h:
-        h.write(line)
+    append_history(ts, val_f1, gs, search, n_samples=len(train))
 
     print("[BEST PARAMS]", gs.best_params_)
     print(f"[VAL macro-F1] {val_f1:.4f}")
@@ -104,4 +272,39 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    p = argparse.ArgumentParser()
+    p.add_argument("--vectorizer", choices=["tfidf", "hashing"], default="tfidf")
+    p.add_argument("--n-features-bits", type=int, default=HASH_BITS)
+    p.add_argument(
+        "--engine",
+        choices=["cached", "grid"],
+        default="cached",
+        help="cached: reuse n-gram counts across the grid; grid: plain GridSearchCV",
+    )
+    p.add_argument(
+        "--search",
+        choices=SEARCH_MODES,
+        default="grid",
+        help="grid: PARAM_GRID; halving: successive halving on n_samples; "
+        "random: random search until --budget seconds are spent",
+    )
+    p.add_argument(
+        "--budget",
+        type=float,
+        default=300.0,
+        help="seconds (random); soft limit, checked between candidates",
+    )
+    p.add_argument("--n-candidates", type=int, default=64)
+    p.add_argument("--seed", type=int, default=42)
+    args = p.parse_args()
+    main(
+        vectorizer=args.vectorizer,
+        n_bits=args.n_features_bits,
+        engine=args.engine,
+        search=args.search,
+        budget=args.budget,
+        n_candidates=args.n_candidates,
+        seed=args.seed,
+    )
@@ -1,3 +1,5 @@
+import sys
+
 import pytest
 from fastapi.testclient import TestClient
 from pathlib import Path
@@ -5,12 +7,14 @@ from pathlib import Path
 try:
     from app.main import app
 except Exception:
-    import sys
-
     sys.path.append(str(Path(__file__).resolve().parents[1]))
     from app.main import app
 
+# Scripts import each other as top-level modules (python scripts/eval.py).
+sys.path.append(str(Path(__file__).resolve().parents[1] / "scripts"))
+
 
 @pytest.fixture(scope="session")
 def client():
-    return TestClient(app)
+    with TestClient(app) as c:
+        yield c
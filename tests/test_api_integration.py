@@ -60,3 +60,59 @@ def test_feedback_ok(client):
     )
     assert r.status_code == 200
     assert r.json()["status"] == "stored"
+
+
+def test_predict_batch_ok(client):
+    texts = [
+        "You are great person with charming personality and good attitude.",
+        "ok",
+        "You are the worst person i ever met, you idiot!",
+    ]
+    r = client.post("/predict/batch", json={"texts": texts})
+    assert r.status_code == 200
+    items = r.json()["items"]
+    assert len(items) == len(texts)
+    for item, text in zip(items, texts):
+        assert set(item.keys()) == {"label", "prob", "low_confidence"}
+        single = client.post("/predict", json={"text": text}).json()
+        assert item["label"] == single["label"]
+        assert abs(item["prob"] - single["prob"]) < 1e-9
+    assert items[1]["low_confidence"] is True
+
+
+@pytest.mark.parametrize("bad", [[], [""], "text", None])
+def test_predict_batch_invalid_payload(client, bad):
+    r = client.post("/predict/batch", json={"texts": bad})
+    assert r.status_code == 422
+
+
+def test_admin_reload_keeps_serving(client):
+    r = client.post("/admin/reload")
+    assert r.status_code == 200
+    body = r.json()
+    assert body["status"] == "reloaded"
+    assert client.get("/health").json()["model_version"] == body["model_version"]
+    assert client.post("/predict", json={"text": "still works"}).status_code == 200
+
+
+def test_predict_batching_timeout_returns_503(client, monkeypatch):
+    import threading
+
+    import app.main as main
+    from app.batching import MicroBatcher
+
+    release = threading.Event()
+
+    def stuck(texts):
+        release.wait(5)
+        return [{"label": "clean", "prob": 0.0, "low_confidence": True}] * len(texts)
+
+    batcher = MicroBatcher(stuck, window_ms=1, max_size=4)
+    monkeypatch.setattr(main, "_batcher", batcher)
+    monkeypatch.setattr(main, "BATCH_TIMEOUT_S", 0.05)
+    try:
+        r = client.post("/predict", json={"text": "hello there"})
+        assert r.status_code == 503
+    finally:
+        release.set()
+        batcher.stop()
@@ -0,0 +1,118 @@
+import threading
+import time
+
+import pytest
+
+from app.batching import MicroBatcher
+
+
+def _fake_predict(calls):
+    def fn(texts):
+        calls.append(list(texts))
+        return [
+            {"label": t, "prob": float(len(t)), "low_confidence": False} for t in texts
+        ]
+
+    return fn
+
+
+def test_batcher_returns_each_caller_its_result():
+    calls = []
+    batcher = MicroBatcher(_fake_predict(calls), window_ms=50, max_size=8)
+    texts = [f"text-{i}" * (i + 1) for i in range(20)]
+    results = [None] * len(texts)
+
+    def worker(i):
+        results[i] = batcher.predict(texts[i])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(texts))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.stop()
+
+    for text, result in zip(texts, results):
+        assert result["label"] == text
+    assert all(len(c) <= 8 for c in calls)
+    assert len(calls) < len(texts)
+
+    stats = batcher.stats()
+    assert stats["items"] == len(texts)
+    assert stats["batches"] == len(calls)
+    assert 0 < stats["avg_fill_ratio"] <= 1
+
+
+def test_batcher_propagates_errors():
+    def boom(texts):
+        raise RuntimeError("model down")
+
+    batcher = MicroBatcher(boom, window_ms=1, max_size=4)
+    fut = batcher.submit("x")
+    with pytest.raises(RuntimeError, match="model down"):
+        fut.result(timeout=5)
+    batcher.stop()
+    assert batcher.stats()["errors"] == 1
+
+
+def test_stop_fails_requests_left_in_queue():
+    release = threading.Event()
+    calls = []
+
+    def slow(texts):
+        release.wait(5)
+        return _fake_predict(calls)(texts)
+
+    batcher = MicroBatcher(slow, window_ms=1, max_size=4)
+    first = batcher.submit("a")
+    while batcher.stats()["queue_depth"]:
+        time.sleep(0.001)
+    second = batcher.submit("b")
+    stopper = threading.Thread(target=batcher.stop)
+    stopper.start()
+    while batcher.stats()["queue_depth"] < 2:
+        time.sleep(0.001)
+    # Arrives behind the stop marker: the worker never picks it up.
+    late = batcher.submit("c")
+    release.set()
+    stopper.join(5)
+
+    assert first.result(timeout=1)["label"] == "a"
+    assert second.result(timeout=1)["label"] == "b"
+    with pytest.raises(RuntimeError, match="stopped"):
+        late.result(timeout=1)
+
+
+def test_cancelled_requests_are_not_scored():
+    calls = []
+    batcher = MicroBatcher(_fake_predict(calls), window_ms=50, max_size=8)
+    batcher.start()
+    gone = batcher.submit("timed-out")
+    assert gone.cancel()
+    assert batcher.predict("kept")["label"] == "kept"
+    batcher.stop()
+    assert calls == [["kept"]]
+
+
+def test_stop_does_not_drain_while_worker_busy():
+    release = threading.Event()
+    calls = []
+
+    def slow(texts):
+        release.wait(5)
+        return _fake_predict(calls)(texts)
+
+    batcher = MicroBatcher(slow, window_ms=1, max_size=1)
+    first = batcher.submit("a")
+    while batcher.stats()["queue_depth"]:
+        time.sleep(0.001)
+    second = batcher.submit("b")
+    thread = batcher._thread
+    batcher.stop(timeout=0.05)
+    # The worker still owns the queue: "b" and the stop marker stay for it.
+    assert not second.done()
+    release.set()
+    assert second.result(timeout=5)["label"] == "b"
+    assert first.result(timeout=5)["label"] == "a"
+    thread.join(5)
+    assert not thread.is_alive()
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from sklearn.metrics import f1_score
+
+from bootstrap import bootstrap_metrics, macro_f1_weighted
+
+
+def _unit(n):
+    return np.ones((1, n))
+
+
+@pytest.mark.parametrize(
+    "y, pred",
+    [
+        ([1, 1, 1, 1], [1, 1, 0, 1]),
+        ([0, 0, 0], [0, 0, 0]),
+        ([1, 1, 1], [1, 1, 1]),
+        ([0, 0, 0, 0], [0, 1, 0, 0]),
+        ([0, 1, 1, 0, 1], [0, 1, 0, 0, 1]),
+    ],
+)
+def test_macro_f1_matches_sklearn(y, pred):
+    expected = f1_score(y, pred, average="macro")
+    assert macro_f1_weighted(pred, y, _unit(len(y)))[0] == pytest.approx(expected)
+
+
+def test_macro_f1_resample_counts_match_sklearn():
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, 2, 40)
+    pred = rng.integers(0, 2, 40)
+    idx = rng.integers(0, 40, 40)
+    w = np.bincount(idx, minlength=40)[None, :].astype(np.float64)
+    expected = f1_score(y[idx], pred[idx], average="macro")
+    assert macro_f1_weighted(pred, y, w)[0] == pytest.approx(expected)
+
+
+def test_bootstrap_single_class_slice():
+    proba = np.array([0.9, 0.8, 0.7, 0.2])
+    y = np.ones(4, dtype=int)
+    boot = bootstrap_metrics(proba, y, threshold=0.5, n_boot=50)
+    assert np.all(boot["macro_f1"] <= 1.0)
+    # All resamples are single-class: AUC is undefined, F1 is over one class.
+    assert np.isnan(boot["roc_auc"]).all()
+    assert boot["macro_f1"].max() == 1.0
+
+
+def test_eval_report_nan_becomes_null_without_touching_strings():
+    import json
+
+    from eval import _nan_to_none
+
+    report = {"model_file": "NaN_model.joblib", "slices": [{"roc_auc": np.nan}]}
+    text = json.dumps(_nan_to_none(report), allow_nan=False)
+    assert json.loads(text) == {
+        "model_file": "NaN_model.joblib",
+        "slices": [{"roc_auc": None}],
+    }
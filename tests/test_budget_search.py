@@ -0,0 +1,80 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.base import BaseEstimator, ClassifierMixin
+
+import tune
+from budget_search import BudgetedRandomSearch
+
+
+class _SlowClassifier(ClassifierMixin, BaseEstimator):
+    def __init__(self, delay=0.0, bias=0):
+        self.delay = delay
+        self.bias = bias
+
+    def fit(self, X, y):
+        time.sleep(self.delay)
+        self.classes_ = np.unique(y)
+        return self
+
+    def predict(self, X):
+        return np.full(len(X), self.bias)
+
+
+X = np.arange(30).reshape(-1, 1)
+Y = np.array([0, 1] * 15)
+
+
+def test_budget_stops_sampling_after_exhaustion():
+    search = BudgetedRandomSearch(
+        _SlowClassifier(),
+        {"delay": [0.03], "bias": [0, 1]},
+        budget_sec=0.05,
+        max_trials=20,
+        cv=3,
+        n_jobs=1,
+    ).fit(X, Y)
+    # 3 folds x 30ms > 50ms: the first trial overruns and nothing else starts.
+    assert search.n_trials_ == 1
+    assert len(search.cv_results_["params"]) == 1
+    assert search.search_time_ >= 0.05
+
+
+def test_budget_too_small_raises():
+    search = BudgetedRandomSearch(
+        _SlowClassifier(), {"bias": [0, 1]}, budget_sec=0, cv=3, n_jobs=1
+    )
+    with pytest.raises(ValueError, match="budget too small"):
+        search.fit(X, Y)
+
+
+def _split(n, seed):
+    rng = np.random.default_rng(seed)
+    toxic = ["idiot", "stupid", "hate", "moron"]
+    clean = ["thanks", "great", "patch", "helpful"]
+    y = rng.integers(0, 2, n)
+    texts = [
+        " ".join(rng.choice(toxic if label else clean, 3)) + " you the code"
+        for label in y
+    ]
+    return pd.DataFrame({"text": texts, "label": y, "clean": texts})
+
+
+@pytest.mark.parametrize("search", ["halving", "random"])
+def test_tune_budgeted_modes(search, tmp_path, monkeypatch):
+    monkeypatch.setattr(tune, "MODELS", tmp_path)
+    monkeypatch.setattr(
+        tune,
+        "load_split",
+        lambda split, clean=False: _split(90 if split == "train" else 30, len(split)),
+    )
+    tune.main(search=search, budget=30, n_candidates=3)
+
+    meta = (tmp_path / "metadata.json").read_text(encoding="utf-8")
+    assert f'"search": "{search}"' in meta
+    history = pd.read_csv(tmp_path / "history.csv")
+    assert list(history.columns) == tune.HISTORY_COLUMNS
+    assert (history["search"] == search).all()
+    assert (history["trial"] == "best").sum() == 1
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+from sklearn.exceptions import FitFailedWarning
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import GridSearchCV
+from sklearn.pipeline import Pipeline
+
+from cached_search import CachedTfidfSearch
+
+
+def _corpus(n=90, seed=0):
+    rng = np.random.default_rng(seed)
+    toxic = ["idiot", "stupid", "hate", "trash", "moron", "shut"]
+    clean = ["thanks", "great", "patch", "review", "helpful", "merge"]
+    common = ["the", "you", "this", "code", "is", "a", "and", "it", "really"]
+    texts, labels = [], []
+    for i in range(n):
+        label = int(rng.random() < 0.4)
+        words = list(rng.choice(common, 5)) + list(
+            rng.choice(toxic if label else clean, 2)
+        )
+        # Label noise keeps fold scores apart instead of all hitting 1.0.
+        if rng.random() < 0.15:
+            words += list(rng.choice(clean if label else toxic, 2))
+        rng.shuffle(words)
+        texts.append(" ".join(words))
+        labels.append(label)
+    return texts, np.array(labels)
+
+
+def test_cached_search_matches_grid_search():
+    texts, y = _corpus()
+    pipe = Pipeline(
+        [("tfidf", TfidfVectorizer()), ("clf", LogisticRegression(max_iter=1000))]
+    )
+    grid = {
+        "tfidf__ngram_range": [(1, 1), (1, 2)],
+        "tfidf__min_df": [1, 3],
+        "tfidf__max_df": [0.5, 1.0],
+        "tfidf__max_features": [None, 12],
+        "tfidf__sublinear_tf": [False, True],
+        "clf__C": [0.1, 1.0],
+    }
+    ref = GridSearchCV(pipe, grid, scoring="f1_macro", cv=3).fit(texts, y)
+    cached = CachedTfidfSearch(pipe, grid, cv=3).fit(texts, y)
+
+    assert cached.cv_results_["params"] == list(ref.cv_results_["params"])
+    for f in range(3):
+        np.testing.assert_allclose(
+            cached.cv_results_[f"split{f}_test_score"],
+            ref.cv_results_[f"split{f}_test_score"],
+        )
+    assert cached.best_params_ == ref.best_params_
+    assert cached.best_score_ == ref.best_score_
+    assert len(set(np.round(ref.cv_results_["mean_test_score"], 6))) > 1
+    np.testing.assert_allclose(
+        cached.best_estimator_.predict_proba(texts),
+        ref.best_estimator_.predict_proba(texts),
+    )
+
+
+def test_infeasible_candidates_score_nan_like_grid_search():
+    texts, y = _corpus()
+    pipe = Pipeline(
+        [("tfidf", TfidfVectorizer()), ("clf", LogisticRegression(max_iter=1000))]
+    )
+    # min_df=70 leaves no terms on a 60-document train fold; max_df=0.01 is
+    # below min_df=2. Both make TfidfVectorizer.fit raise.
+    grid = {
+        "tfidf__min_df": [1, 2, 70],
+        "tfidf__max_df": [0.01, 1.0],
+        "clf__C": [0.1, 1.0],
+    }
+    with pytest.warns(FitFailedWarning):
+        ref = GridSearchCV(pipe, grid, scoring="f1_macro", cv=3).fit(texts, y)
+    cached = CachedTfidfSearch(pipe, grid, cv=3).fit(texts, y)
+
+    for f in range(3):
+        np.testing.assert_allclose(
+            cached.cv_results_[f"split{f}_test_score"],
+            ref.cv_results_[f"split{f}_test_score"],
+        )
+    assert np.isnan(cached.cv_results_["mean_test_score"]).any()
+    assert cached.best_params_ == ref.best_params_
+    assert cached.best_score_ == ref.best_score_
@@ -0,0 +1,51 @@
+import os
+
+import pandas as pd
+import pytest
+
+import dataset
+from app.utils import uses_clean
+
+
+@pytest.fixture
+def split_dir(tmp_path):
+    df = pd.DataFrame(
+        {
+            "text": ["<b>Hello</b> there", "you are an idiot 😊", "12345", "ok"],
+            "label": [0, 1, 0, 0],
+        }
+    )
+    df.to_csv(tmp_path / "train.csv", index=False)
+    return tmp_path, df
+
+
+@pytest.mark.parametrize("clean", [False, True])
+def test_load_split_feather_matches_csv(split_dir, clean):
+    pytest.importorskip("pyarrow")
+    data, df = split_dir
+    from_csv = dataset.load_split("train", clean=clean, data=data)
+    assert not dataset.has_columnar("train", data)
+
+    assert dataset.write_columnar(df, dataset.columnar_path("train", data))
+    assert dataset.has_columnar("train", data)
+    from_feather = dataset.load_split("train", clean=clean, data=data)
+    # Feather keeps text as Arrow-backed strings; values must match the CSV path.
+    assert from_feather["text"].dtype == pd.StringDtype("pyarrow")
+    pd.testing.assert_frame_equal(from_feather, from_csv, check_dtype=False)
+
+
+def test_load_split_ignores_stale_feather(split_dir):
+    pytest.importorskip("pyarrow")
+    data, df = split_dir
+    path = dataset.columnar_path("train", data)
+    dataset.write_columnar(df.iloc[:1], path)
+    csv = data / "train.csv"
+    os.utime(path, (csv.stat().st_mtime - 10,) * 2)
+    assert len(dataset.load_split("train", data=data)) == len(df)
+
+
+def test_uses_clean_reads_preprocess_and_notes():
+    assert uses_clean({"preprocess": {"clean_text": True}})
+    assert not uses_clean({"preprocess": {"clean_text": False}, "notes": "clean_text"})
+    assert uses_clean({"notes": "TF-IDF on clean_text"})
+    assert not uses_clean({})
@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+import app.db as db
+
+
+def _timed_engine(tmp_path, **kwargs):
+    return create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=db.TimedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        **kwargs,
+    )
+
+
+def test_get_db_closes_session(monkeypatch):
+    class _Session:
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    for fail in (False, True):
+        session = _Session()
+        monkeypatch.setattr(db, "SessionLocal", lambda: session)
+        gen = db.get_db()
+        assert next(gen) is session
+        if fail:
+            with pytest.raises(RuntimeError):
+                gen.throw(RuntimeError("handler failed"))
+        else:
+            gen.close()
+        assert session.closed
+
+
+def test_pool_stats_reports_checkouts():
+    before = db.pool_stats()
+    with db.engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    after = db.pool_stats()
+    assert after["pool"] == "TimedQueuePool"
+    assert after["checkouts"] > before["checkouts"]
+    assert after["checkout_wait_total_sec"] >= before["checkout_wait_total_sec"]
+    assert {"size", "in_use", "checked_in", "checkout_wait_max_ms"} <= set(after)
+
+
+def test_pool_size_one_contention_waits_then_times_out(tmp_path):
+    engine = _timed_engine(tmp_path, pool_timeout=5)
+    held = engine.connect()
+    before = db._wait_stats.snapshot()
+    waited = []
+
+    def _checkout():
+        t0 = time.perf_counter()
+        with engine.connect():
+            waited.append(time.perf_counter() - t0)
+
+    worker = threading.Thread(target=_checkout)
+    worker.start()
+    time.sleep(0.1)
+    held.close()
+    worker.join(5)
+    after = db._wait_stats.snapshot()
+    assert waited and waited[0] >= 0.05
+    assert after["checkouts"] - before["checkouts"] == 1
+    assert after["checkout_wait_total_sec"] - before["checkout_wait_total_sec"] >= 0.05
+
+    engine = _timed_engine(tmp_path, pool_timeout=0.05)
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    assert (
+        db._wait_stats.snapshot()["checkout_timeouts"] == after["checkout_timeouts"] + 1
+    )
@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+import app.main as main
+from app.db import get_session, to_async_url
+from app.db_models import Base, Feedback, Prediction
+from app.persistence import PredictionWriter
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("sqlite:///./test.db", "sqlite+aiosqlite:///./test.db"),
+        ("sqlite+aiosqlite:///./test.db", "sqlite+aiosqlite:///./test.db"),
+        (
+            "postgresql://user:secret@db:5432/app",
+            "postgresql+asyncpg://user:secret@db:5432/app",
+        ),
+        (
+            "postgresql+psycopg2://user:secret@db/app",
+            "postgresql+asyncpg://user:secret@db/app",
+        ),
+        (
+            "postgresql+asyncpg://user:secret@db/app",
+            "postgresql+asyncpg://user:secret@db/app",
+        ),
+    ],
+)
+def test_to_async_url(url, expected):
+    assert to_async_url(url) == expected
+
+
+def test_to_async_url_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        to_async_url("mysql://user@db/app")
+
+
+@pytest.fixture
+def async_db(client, tmp_path, monkeypatch):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(bind=sync_engine)
+    async_engine = create_async_engine(to_async_url(url))
+    factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def _get_async_db():
+        async with factory() as db:
+            yield db
+
+    monkeypatch.setattr(main, "DB_ASYNC", True)
+    monkeypatch.setattr(
+        main, "_writer", PredictionWriter("sync", sessionmaker(sync_engine), factory)
+    )
+    main.app.dependency_overrides[get_session] = _get_async_db
+    try:
+        yield sessionmaker(bind=sync_engine)
+    finally:
+        main.app.dependency_overrides.pop(get_session, None)
+        client.portal.call(async_engine.dispose)
+        sync_engine.dispose()
+
+
+def _count(session_factory, model):
+    with session_factory() as db:
+        return db.scalar(select(func.count()).select_from(model))
+
+
+def test_async_db_feedback_and_predict(client, async_db):
+    r = client.post("/feedback", json={"text": "you idiot", "true_label": 1})
+    assert r.status_code == 200 and r.json() == {"status": "stored"}
+    assert _count(async_db, Feedback) == 1
+
+    r = client.post("/predict", json={"text": "Thanks, the patch was helpful"})
+    assert r.status_code == 200
+    assert _count(async_db, Prediction) == 1
+    assert main._writer.stats()["written"] == 1
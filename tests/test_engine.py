@@ -0,0 +1,165 @@
+import dataclasses
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import (
+    HashingVectorizer,
+    TfidfTransformer,
+    TfidfVectorizer,
+)
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+import app.predict as predict
+from app.engine import (
+    HashedLinearScorer,
+    LinearTextScorer,
+    MmapLinearScorer,
+    compile_pipeline,
+    load_mmap,
+    save_mmap,
+)
+from app.utils import clean_text
+
+
+@pytest.fixture(scope="module")
+def texts():
+    df = pd.read_csv("data/processed/test.csv")
+    return df["text"].astype(str).map(clean_text).tolist() + ["", "zzz unknown"]
+
+
+@pytest.fixture(scope="module")
+def train_df():
+    return pd.read_csv("data/processed/train.csv")
+
+
+def test_engine_matches_shipped_model(texts):
+    predict.load_model()
+    pipe = predict.current_state().model
+    engine = compile_pipeline(pipe)
+    np.testing.assert_allclose(
+        engine.predict_proba(texts), pipe.predict_proba(texts), atol=1e-12
+    )
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"ngram_range": (1, 2)},
+        {"ngram_range": (1, 3), "sublinear_tf": True, "min_df": 2},
+        {"norm": "l1", "binary": True, "stop_words": "english"},
+        {"use_idf": False, "norm": None, "ngram_range": (2, 2)},
+    ],
+)
+def test_engine_matches_vectorizer_options(texts, train_df, params):
+    pipe = Pipeline(
+        [
+            ("tfidf", TfidfVectorizer(**params)),
+            ("clf", LogisticRegression(max_iter=1000)),
+        ]
+    ).fit(train_df["text"], train_df["label"])
+    engine = compile_pipeline(pipe)
+    np.testing.assert_allclose(
+        engine.predict_proba(texts), pipe.predict_proba(texts), atol=1e-12
+    )
+
+
+@pytest.mark.parametrize(
+    "hash_params,tfidf_params",
+    [
+        ({"ngram_range": (1, 2)}, {}),
+        ({"n_features": 64, "binary": True}, {"sublinear_tf": True}),
+        ({"stop_words": "english"}, {"norm": "l1", "use_idf": False}),
+    ],
+)
+def test_hashed_engine_matches_pipeline(texts, train_df, hash_params, tfidf_params):
+    pipe = Pipeline(
+        [
+            ("hash", HashingVectorizer(alternate_sign=False, norm=None, **hash_params)),
+            ("tfidf", TfidfTransformer(**tfidf_params)),
+            ("clf", LogisticRegression(max_iter=1000)),
+        ]
+    ).fit(train_df["text"], train_df["label"])
+    engine = compile_pipeline(pipe)
+    assert isinstance(engine, HashedLinearScorer)
+    np.testing.assert_allclose(
+        engine.predict_proba(texts), pipe.predict_proba(texts), atol=1e-12
+    )
+
+
+def test_engine_roundtrip_and_serving(tmp_path, monkeypatch, texts):
+    predict.load_model()
+    state = predict.current_state()
+    path = tmp_path / "model.engine.joblib"
+    joblib.dump(compile_pipeline(state.model), path)
+    engine = joblib.load(path)
+    assert isinstance(engine, LinearTextScorer)
+
+    expected = [predict.predict_one(t) for t in texts[:20]]
+    monkeypatch.setattr(predict, "_state", dataclasses.replace(state, model=engine))
+    monkeypatch.setattr(predict, "_cache", None)
+    for got in (
+        predict.predict_batch(texts[:20]),
+        map(predict.predict_one, texts[:20]),
+    ):
+        for g, e in zip(got, expected):
+            assert g["label"] == e["label"]
+            assert g["low_confidence"] == e["low_confidence"]
+            assert g["prob"] == pytest.approx(e["prob"], abs=1e-12)
+
+
+def test_compile_rejects_unsupported_pipeline(train_df):
+    pipe = Pipeline(
+        [
+            ("tfidf", TfidfVectorizer(analyzer="char")),
+            ("clf", LogisticRegression(max_iter=1000)),
+        ]
+    ).fit(train_df["text"], train_df["label"])
+    with pytest.raises(ValueError):
+        compile_pipeline(pipe)
+
+
+def test_mmap_artifact_matches_engine(tmp_path, texts, train_df):
+    pipe = Pipeline(
+        [
+            ("tfidf", TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True)),
+            ("clf", LogisticRegression(max_iter=1000)),
+        ]
+    ).fit(train_df["text"], train_df["label"])
+    engine = compile_pipeline(pipe)
+    mm = load_mmap(save_mmap(engine, tmp_path / "model.mmap"))
+    assert len(mm) == len(engine)
+    assert {mm.term_at(i) for i in range(len(mm))} == set(engine.terms)
+    np.testing.assert_allclose(
+        mm.predict_proba(texts), pipe.predict_proba(texts), atol=1e-12
+    )
+    for t in texts[:10]:
+        assert dict(mm.contributions(t)) == pytest.approx(
+            dict(engine.contributions(t)), abs=1e-12
+        )
+    with pytest.raises(TypeError):
+        joblib.dump(mm, tmp_path / "nope.joblib")
+
+
+def test_load_model_prefers_mmap_dir(tmp_path, monkeypatch, texts):
+    predict.load_model()
+    state = predict.current_state()
+    expected = state.model.predict_proba(texts)[:, 1]
+    mmap_dir = save_mmap(compile_pipeline(state.model), tmp_path / "model.mmap")
+    meta = dict(state.meta, mmap_dir=str(mmap_dir))
+    meta_path = tmp_path / "metadata.json"
+    meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+    monkeypatch.setattr(predict, "_METADATA_PATH", meta_path)
+    monkeypatch.setattr(predict, "_state", None)
+    loaded = predict.reload_model()
+    assert isinstance(loaded.model, MmapLinearScorer)
+    np.testing.assert_allclose(
+        loaded.model.predict_proba(texts)[:, 1], expected, atol=1e-12
+    )
+
+    monkeypatch.setattr(predict, "MODEL_ENGINE", "sklearn")
+    assert isinstance(predict.reload_model().model, Pipeline)
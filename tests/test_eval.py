@@ -0,0 +1,54 @@
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import f1_score
+from sklearn.pipeline import Pipeline
+
+import eval as eval_script
+from app.utils import clean_text
+
+
+def test_compare_models_scores_each_model_on_its_own_input(tmp_path, capsys):
+    texts = [
+        "<b>You IDIOT</b>",
+        "Thanks &amp; well done",
+        "STUPID <i>moron</i>",
+        "Great   PATCH",
+        "<p>idiot</p> code",
+        "nice <b>work</b>",
+    ]
+    y = np.array([1, 0, 1, 0, 1, 0])
+    df = pd.DataFrame({"text": texts, "label": y})
+    df["clean"] = df["text"].map(clean_text)
+
+    # Raw-text features would include markup tokens ("b", "amp") the clean
+    # model never saw; scoring with the wrong input changes the numbers.
+    pipe = Pipeline(
+        [("tfidf", TfidfVectorizer()), ("clf", LogisticRegression(C=100))]
+    ).fit(["idiot", "thanks well done", "stupid", "great patch"], [1, 0, 1, 0])
+    model_path = tmp_path / "clean_model.joblib"
+    joblib.dump(pipe, model_path)
+    meta_path = tmp_path / "metadata.json"
+    meta_path.write_text(
+        json.dumps({"model_file": str(model_path), "notes": "clean_text applied"}),
+        encoding="utf-8",
+    )
+
+    entry = eval_script.compare_entry(str(meta_path), default_clean=False)
+    assert entry == (model_path, True)
+    assert eval_script.compare_entry(str(model_path), default_clean=False) == (
+        model_path,
+        False,
+    )
+
+    eval_script.compare_models([entry], df, threshold=0.5)
+    row = capsys.readouterr().out.strip().splitlines()[-1].split()
+    expected = f1_score(
+        y, pipe.predict_proba(df["clean"])[:, 1] >= 0.5, average="macro"
+    )
+    assert row[1] == "yes"
+    assert float(row[6]) == round(expected, 4)
@@ -0,0 +1,79 @@
+import dataclasses
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.pipeline import Pipeline
+from sklearn.tree import DecisionTreeClassifier
+
+import app.predict as predict
+from app.engine import compile_pipeline
+from app.explain import (
+    CompiledExplainer,
+    ExplainUnsupported,
+    build_explainer,
+    top_contributions,
+)
+
+TEXT = "Thanks for the helpful patch, nice work on the function"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _loaded_model():
+    predict.load_model()
+
+
+def test_explanation_matches_prediction():
+    explained = predict.explain_one(TEXT, top_k=50)
+    result = predict.predict_one(TEXT)
+    assert explained["label"] == result["label"]
+    assert explained["prob"] == pytest.approx(result["prob"], abs=1e-12)
+    contribs = [c["contribution"] for c in explained["top_positive"]]
+    contribs += [c["contribution"] for c in explained["top_negative"]]
+    logit = np.log(explained["prob"] / (1 - explained["prob"]))
+    assert sum(contribs) + explained["intercept"] == pytest.approx(logit)
+
+
+def test_compiled_explainer_matches_pipeline():
+    state = predict.current_state()
+    input_text = predict._prepare(TEXT, state.apply_clean)[0]
+    p1, labels1, values1 = state.explainer.explain_many([input_text])[0]
+    scorer = compile_pipeline(state.model)
+    p2, labels2, values2 = CompiledExplainer(scorer).explain_many([input_text])[0]
+    assert p1 == pytest.approx(p2, abs=1e-9)
+    assert dict(zip(labels1, values1)) == pytest.approx(dict(zip(labels2, values2)))
+
+
+def test_top_contributions_sorted_and_signed():
+    labels = ["a", "b", "c", "d"]
+    pos, neg = top_contributions(labels, np.array([0.5, -1.0, 2.0, 0.0]), k=2)
+    assert [c["ngram"] for c in pos] == ["c", "a"]
+    assert [c["ngram"] for c in neg] == ["b"]
+
+
+def test_explain_endpoints(client):
+    r = client.post("/explain", json={"text": TEXT, "top_k": 3})
+    assert r.status_code == 200
+    body = r.json()
+    assert len(body["top_positive"]) <= 3 and len(body["top_negative"]) <= 3
+    r = client.post("/explain/batch", json={"texts": [TEXT, "ok"]})
+    assert r.status_code == 200
+    assert len(r.json()["items"]) == 2
+    assert client.post("/explain", json={"text": TEXT, "top_k": 0}).status_code == 422
+
+
+def test_explain_non_linear_model_is_501(client, monkeypatch):
+    tree = Pipeline(
+        [("tfidf", TfidfVectorizer()), ("clf", DecisionTreeClassifier())]
+    ).fit(["you idiot", "nice patch", "stupid code", "thanks"], [1, 0, 1, 0])
+    assert build_explainer(tree) is None
+    state = dataclasses.replace(predict.current_state(), model=tree, explainer=None)
+    monkeypatch.setattr(predict, "_state", state)
+
+    with pytest.raises(ExplainUnsupported):
+        predict.explain_one(TEXT)
+    r = client.post("/explain", json={"text": TEXT})
+    assert r.status_code == 501
+    assert "linear model" in r.json()["detail"]
+    assert client.post("/explain/batch", json={"texts": [TEXT]}).status_code == 501
+    assert client.post("/predict", json={"text": TEXT}).status_code == 200
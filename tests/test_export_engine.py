@@ -0,0 +1,29 @@
+import json
+
+import joblib
+import pytest
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+import export_engine
+
+
+def test_mmap_export_rejects_hashing_model(tmp_path, monkeypatch):
+    pipe = Pipeline(
+        [
+            ("hash", HashingVectorizer(alternate_sign=False, norm=None)),
+            ("tfidf", TfidfTransformer()),
+            ("clf", LogisticRegression()),
+        ]
+    ).fit(["you are an idiot", "have a nice day"], [1, 0])
+    model_file = tmp_path / "hashed.joblib"
+    joblib.dump(pipe, model_file)
+    meta = {"model_file": model_file.as_posix(), "vectorizer": "hashing"}
+    (tmp_path / "metadata.json").write_text(json.dumps(meta), encoding="utf-8")
+    monkeypatch.setattr(export_engine, "MODELS", tmp_path)
+
+    with pytest.raises(SystemExit, match="--format joblib"):
+        export_engine.main(fmt="mmap")
+    assert not (tmp_path / "hashed.mmap").exists()
+    assert json.loads((tmp_path / "metadata.json").read_text()) == meta
@@ -0,0 +1,61 @@
+import io
+import json
+import logging
+import queue
+from logging.handlers import QueueListener
+
+from app import logs
+
+
+def _record(msg, *args, **kw):
+    return logging.LogRecord("t", logging.INFO, __file__, 1, msg, args, None, **kw)
+
+
+def test_json_formatter_merges_fields():
+    record = _record("predict %s", "len=3")
+    record.fields = {"event": "predict", "len": 3}
+    out = json.loads(logs.JsonFormatter().format(record))
+    assert out["msg"] == "predict len=3"
+    assert out["event"] == "predict" and out["len"] == 3
+    assert out["level"] == "INFO"
+
+
+def test_sample_request_respects_rate(monkeypatch):
+    level = logs.request_logger.level
+    logs.request_logger.setLevel(logging.INFO)
+    try:
+        monkeypatch.setattr(logs, "LOG_SAMPLE_RATE", 0.0)
+        assert not any(logs.sample_request() for _ in range(100))
+        monkeypatch.setattr(logs, "LOG_SAMPLE_RATE", 1.0)
+        assert all(logs.sample_request() for _ in range(100))
+        logs.request_logger.setLevel(logging.WARNING)
+        assert not logs.sample_request()
+    finally:
+        logs.request_logger.setLevel(level)
+
+
+def test_queue_handler_formats_on_listener():
+    formatted = []
+
+    class _Spy:
+        def __init__(self, fields):
+            self.fields = fields
+
+        def __str__(self):
+            formatted.append(True)
+            return "x"
+
+    q = queue.SimpleQueue()
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    listener = QueueListener(q, handler)
+    logger = logging.getLogger("test-logs-queue")
+    logger.propagate = False
+    logger.addHandler(logs._DeferredQueueHandler(q))
+    try:
+        logger.warning("value=%s", _Spy({}))
+        assert not formatted  # nothing rendered in the calling thread
+        listener.start()
+    finally:
+        listener.stop()
+    assert stream.getvalue() == "value=x\n"
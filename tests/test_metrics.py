@@ -0,0 +1,35 @@
+from app import metrics
+
+
+def test_histogram_renders_cumulative_buckets():
+    h = metrics.Histogram(
+        "t_seconds", "test", ("stage",), buckets=(0.1, 1.0), registry=[]
+    )
+    for v in (0.05, 0.5, 0.5, 5.0):
+        h.observe(v, ("model",))
+    lines = h.render()
+    assert 't_seconds_bucket{stage="model",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{stage="model",le="1.0"} 3' in lines
+    assert 't_seconds_bucket{stage="model",le="+Inf"} 4' in lines
+    assert 't_seconds_count{stage="model"} 4' in lines
+    assert h.count(("model",)) == 4
+
+
+def test_counter_escapes_label_values():
+    c = metrics.Counter("t_total", "test", ("path",), registry=[])
+    c.inc(('a"b\\c',), 2)
+    assert c.render()[-1] == 't_total{path="a\\"b\\\\c"} 2.0'
+
+
+def test_metrics_endpoint_after_predict(client):
+    text = "Metrics endpoint sample comment about a helpful patch"
+    assert client.post("/predict", json={"text": text}).status_code == 200
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    body = r.text
+    assert 'toxicity_predictions_total{endpoint="predict"' in body
+    assert 'toxicity_stage_seconds_count{stage="preprocess",mode="one"}' in body
+    assert 'toxicity_stage_seconds_count{stage="framework",mode="http"}' in body
+    assert 'toxicity_http_request_seconds_count{method="POST",path="/predict"' in body
+    assert "toxicity_model_info{" in body
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db_models import Base, Prediction
+from app.persistence import PredictionWriter
+
+
+@pytest.fixture()
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'persist.db'}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def _rows(n):
+    return [{"text": f"t{i}", "pred_label": "clean", "prob": 0.1} for i in range(n)]
+
+
+def _count(session_factory):
+    with session_factory() as db:
+        return db.scalar(select(func.count()).select_from(Prediction))
+
+
+def test_sync_mode_writes_immediately(session_factory):
+    writer = PredictionWriter("sync", session_factory)
+    writer.record(_rows(3))
+    assert _count(session_factory) == 3
+
+
+def test_async_mode_flushes_in_batches_and_on_stop(session_factory):
+    writer = PredictionWriter(
+        "async", session_factory, batch_size=10, flush_interval=60
+    )
+    writer.start()
+    for _ in range(25):
+        writer.record(_rows(1))
+    writer.stop()
+    assert _count(session_factory) == 25
+    stats = writer.stats()
+    assert stats["written"] == 25 and stats["dropped"] == 0
+    assert stats["flushes"] == 3
+
+
+def test_async_mode_drops_when_queue_full(session_factory):
+    entered, release = threading.Event(), threading.Event()
+
+    def _stalled_session():
+        entered.set()
+        release.wait(5)
+        return session_factory()
+
+    writer = PredictionWriter(
+        "async", _stalled_session, batch_size=1, queue_size=2, put_timeout=0.01
+    )
+    writer.start()
+    writer.record(_rows(1))
+    assert entered.wait(5)
+    # Writer is stuck flushing the first row: two rows fit, the rest time out.
+    asyncio.run(writer.arecord(_rows(8)))
+    assert writer.stats()["dropped"] == 6
+    release.set()
+    writer.stop()
+    assert _count(session_factory) == 3
+
+
+def test_stop_returns_when_queue_full_and_db_stalled(session_factory):
+    entered, release = threading.Event(), threading.Event()
+
+    def _stalled_session():
+        entered.set()
+        release.wait(5)
+        return session_factory()
+
+    writer = PredictionWriter(
+        "async", _stalled_session, batch_size=1, queue_size=1, put_timeout=0.01
+    )
+    writer.start()
+    writer.record(_rows(1))
+    assert entered.wait(5)
+    writer.record(_rows(1))
+    assert writer.stats()["queue_depth"] == 1
+
+    t0 = time.perf_counter()
+    writer.stop(timeout=0.2)
+    assert time.perf_counter() - t0 < 1.0
+    release.set()
+
+
+def test_off_mode_writes_nothing(session_factory):
+    writer = PredictionWriter("off", session_factory)
+    writer.record(_rows(3))
+    assert _count(session_factory) == 0
+
+
+def test_async_mode_enqueues_inline_when_queue_has_room(session_factory, monkeypatch):
+    import app.persistence as persistence
+
+    async def _no_threadpool(*args):
+        raise AssertionError("enqueue with free slots must not hop threads")
+
+    monkeypatch.setattr(persistence, "run_in_threadpool", _no_threadpool)
+    writer = PredictionWriter("async", session_factory, flush_interval=60)
+    asyncio.run(writer.arecord(_rows(5)))
+    writer.stop()
+    assert _count(session_factory) == 5
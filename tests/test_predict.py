@@ -0,0 +1,197 @@
+import dataclasses
+import json
+
+import joblib
+import pytest
+
+import app.predict as predict
+from app.utils import clean_text
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _loaded_model():
+    predict.load_model()
+
+
+def test_raw_model_skips_clean_text_for_plain_input(monkeypatch):
+    state = predict.current_state()
+    monkeypatch.setattr(
+        predict, "_state", dataclasses.replace(state, apply_clean=False)
+    )
+
+    def _fail(_):
+        raise AssertionError("clean_text must not run for plain raw input")
+
+    monkeypatch.setattr(predict, "clean_text", _fail)
+    assert predict.predict_one("ok")["low_confidence"] is True
+    result = predict.predict_one("You are great person with charming personality.")
+    assert set(result) == {"label", "prob", "low_confidence"}
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["ok", "  a  \n b  ", "<b>hi</b>", "&amp;&amp;&amp;&amp;", "😊", "hello world"],
+)
+def test_raw_short_check_matches_clean_text(text):
+    assert predict._is_short_raw(text) == (len(clean_text(text)) < predict.SHORT_LEN)
+
+
+def test_cache_hit_skips_model(monkeypatch):
+    text = "Cached   COMMENT about a nice patch"
+    first = predict.predict_one(text)
+
+    class _NoModel:
+        named_steps = {}
+
+        def predict_proba(self, X):
+            raise AssertionError("model must not be called on a cache hit")
+
+    state = predict.current_state()
+    monkeypatch.setattr(predict, "_state", dataclasses.replace(state, model=_NoModel()))
+    assert predict.predict_one("cached comment about a nice patch") == first
+    assert predict.predict_batch([text])[0] == first
+
+
+def test_cache_key_follows_decision_params(monkeypatch):
+    text = "Your patch is stupid and so are you"
+    state = predict.current_state()
+    for threshold, label in ((0.0, "toxic"), (1.01, "clean"), (0.0, "toxic")):
+        monkeypatch.setattr(
+            predict, "_state", dataclasses.replace(state, threshold=threshold)
+        )
+        assert predict.predict_one(text)["label"] == label
+        assert predict.predict_batch([text])[0]["label"] == label
+
+    monkeypatch.setattr(predict, "_state", dataclasses.replace(state, threshold=0.0))
+    monkeypatch.setattr(predict, "LOW_CONF_FLOOR", 0.0)
+    low = predict.predict_one(text)["low_confidence"]
+    monkeypatch.setattr(predict, "LOW_CONF_FLOOR", 1.01)
+    assert predict.predict_one(text)["low_confidence"] is True
+    assert low is False
+
+
+def test_watcher_backs_off_and_logs_once(tmp_path, caplog):
+    from app.hot_reload import MetadataWatcher
+
+    meta_path = tmp_path / "metadata.json"
+    meta_path.write_text("{}", encoding="utf-8")
+    calls = []
+
+    def _reload():
+        calls.append(1)
+        raise FileNotFoundError("models/missing.joblib")
+
+    watcher = MetadataWatcher(meta_path, 1.0, _reload)
+    meta_path.write_text('{"v": 2}', encoding="utf-8")
+    with caplog.at_level("ERROR", logger="toxicity-api"):
+        ticks = [watcher.check() for _ in range(12)]
+    assert not any(ticks)
+    # Attempts on ticks 1, 2, 4, 8: retries back off instead of every tick.
+    assert len(calls) == 4
+    assert len([r for r in caplog.records if r.levelname == "ERROR"]) == 1
+    stats = watcher.stats()
+    assert stats["failing"] and stats["consecutive_failures"] == 4
+    assert "missing.joblib" in stats["last_error"]
+
+
+def test_score_texts_matches_predict_one():
+    texts = ["ok", "<b>You are an idiot</b>", "Thanks, the patch was helpful"]
+    assert predict.score_texts(texts) == [predict.predict_one(t) for t in texts]
+    assert predict.score_texts([]) == []
+
+
+def test_load_model_clears_cache():
+    predict.predict_one("something to remember")
+    assert predict.cache_stats()["size"] > 0
+    predict.load_model()
+    assert predict.cache_stats()["size"] == 0
+
+
+def _write_meta(path, **overrides):
+    meta = dict(predict.current_state().meta)
+    meta["model_file"] = predict.current_state().model_file
+    meta.update(overrides)
+    path.write_text(json.dumps(meta), encoding="utf-8")
+
+
+def test_reload_swaps_whole_snapshot(tmp_path, monkeypatch):
+    meta_path = tmp_path / "metadata.json"
+    _write_meta(meta_path, created_at="reloaded", threshold=0.9)
+    monkeypatch.setattr(predict, "_METADATA_PATH", meta_path)
+
+    before = predict.current_state()
+    state = predict.reload_model()
+    try:
+        assert state is predict.current_state()
+        assert (state.version, state.threshold) == ("reloaded", 0.9)
+        assert predict.get_model_version() == "reloaded"
+        assert before.version != "reloaded"
+    finally:
+        predict._swap(before)
+
+
+def test_reload_keeps_old_model_when_smoke_test_fails(tmp_path, monkeypatch):
+    bogus = tmp_path / "bogus.joblib"
+    joblib.dump({"not": "a model"}, bogus)
+    meta_path = tmp_path / "metadata.json"
+    _write_meta(meta_path, created_at="broken", model_file=str(bogus))
+    monkeypatch.setattr(predict, "_METADATA_PATH", meta_path)
+
+    before = predict.current_state()
+    with pytest.raises(Exception):
+        predict.reload_model()
+    assert predict.current_state() is before
+
+
+def test_watcher_retries_failed_reload(tmp_path):
+    from app.hot_reload import MetadataWatcher
+
+    meta_path = tmp_path / "metadata.json"
+    meta_path.write_text("{}", encoding="utf-8")
+    calls = []
+
+    def _reload():
+        calls.append(1)
+        if len(calls) == 1:
+            raise FileNotFoundError("model not written yet")
+
+    watcher = MetadataWatcher(meta_path, 1.0, _reload)
+    meta_path.write_text('{"v": 2}', encoding="utf-8")
+    assert watcher.check() is False
+    assert watcher.check() is True
+    assert watcher.check() is False
+    assert (len(calls), watcher.failures, watcher.reloads) == (2, 1, 1)
+
+
+def test_shared_cache_keys_on_model_identity(tmp_path, monkeypatch):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+
+    from app.shared_cache import SharedCache
+
+    texts = ["you idiot", "stupid moron", "thanks a lot", "great patch"]
+    model_path = tmp_path / "model_20261017_2314.joblib"
+    meta_path = tmp_path / "metadata.json"
+    # Two runs in the same minute: same version, same file name.
+    _write_meta(
+        meta_path, created="20261017_2314", model_file=str(model_path), threshold=0.5
+    )
+    monkeypatch.setattr(predict, "_METADATA_PATH", meta_path)
+    monkeypatch.setattr(
+        predict, "_shared_cache", SharedCache(str(tmp_path / "shared.db"), 100)
+    )
+
+    before = predict.current_state()
+    labels = []
+    try:
+        for y in ([1, 1, 0, 0], [0, 0, 1, 1]):
+            pipe = Pipeline(
+                [("tfidf", TfidfVectorizer()), ("clf", LogisticRegression(C=100))]
+            ).fit(texts, y)
+            joblib.dump(pipe, model_path)
+            predict.reload_model()
+            labels.append(predict.predict_one("you stupid idiot")["label"])
+    finally:
+        predict._swap(before)
+    assert labels == ["toxic", "clean"]
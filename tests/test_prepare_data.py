@@ -0,0 +1,64 @@
+import pandas as pd
+
+import prepare_data
+
+
+def _raw():
+    # Duplicates after clean_text, several of them across chunk_size=3 borders.
+    texts = [
+        "Hello there",
+        "<b>hello</b>   THERE",
+        "you idiot",
+        "nice patch",
+        "You IDIOT",
+        "thanks &amp; cheers",
+        "thanks & cheers",
+        "stupid code",
+        "nice   patch",
+        "ok then",
+        "Stupid <i>code</i>",
+        "good job 😊",
+        "Good job 😊",
+        "shut up",
+        "merge it",
+        "what trash",
+        "well done",
+        "what  trash",
+        "go away",
+        "lgtm",
+    ]
+    labels = [0, 0, 1, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, 1, 0, 1, 0, 1, 1, 0]
+    return pd.DataFrame({"text": texts, "label": labels})
+
+
+def _run(tmp_path, monkeypatch, workers):
+    out = tmp_path / f"out_{workers}"
+    out.mkdir()
+    monkeypatch.setattr(prepare_data, "OUT", out)
+    monkeypatch.setattr(prepare_data, "load_sources", _raw)
+    prepare_data.main(val_size=0.2, test_size=0.2, workers=workers, chunk_size=3)
+    return out
+
+
+def test_workers_give_identical_splits(tmp_path, monkeypatch):
+    serial = _run(tmp_path, monkeypatch, workers=1)
+    parallel = _run(tmp_path, monkeypatch, workers=2)
+    for name in ("train", "val", "test"):
+        assert (serial / f"{name}.csv").read_bytes() == (
+            parallel / f"{name}.csv"
+        ).read_bytes()
+        if (serial / f"{name}.feather").exists():
+            pd.testing.assert_frame_equal(
+                pd.read_feather(serial / f"{name}.feather"),
+                pd.read_feather(parallel / f"{name}.feather"),
+            )
+    total = sum(len(pd.read_csv(serial / f"{n}.csv")) for n in ("train", "val", "test"))
+    assert total == 13
+
+
+def test_dedup_parallel_keeps_first_occurrence():
+    df = _raw()
+    expected = df.assign(clean=df["text"].map(prepare_data.clean_text))
+    expected = expected.drop_duplicates(subset=["clean"]).reset_index(drop=True)
+    got = prepare_data.dedup_parallel(df, workers=2, chunk_size=3)
+    pd.testing.assert_frame_equal(got[["text", "label", "clean"]], expected)
@@ -0,0 +1,46 @@
+import multiprocessing as mp
+
+from app.shared_cache import SharedCache
+
+RESULT = {"label": "toxic", "prob": 0.9, "low_confidence": False}
+
+
+def _writer(path, worker, n):
+    cache = SharedCache(path, maxsize=10_000, timeout=5)
+    for i in range(n):
+        cache.set(f"w{worker}:{i}", RESULT)
+    assert cache.stats()["errors"] == 0
+
+
+def test_shared_cache_visible_across_instances(tmp_path):
+    path = str(tmp_path / "cache.db")
+    a = SharedCache(path, maxsize=100)
+    b = SharedCache(path, maxsize=100)
+    a.set("k", RESULT)
+    assert b.get("k") == RESULT
+    assert b.get("missing") is None
+    stats = b.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_shared_cache_evicts_oldest(tmp_path):
+    cache = SharedCache(str(tmp_path / "cache.db"), maxsize=20)
+    for i in range(50):
+        cache.set(f"k{i}", RESULT)
+    cache.evict()
+    assert len(cache) == 20
+    assert cache.get("k49") == RESULT
+    assert cache.get("k0") is None
+
+
+def test_shared_cache_concurrent_processes(tmp_path):
+    path = str(tmp_path / "cache.db")
+    SharedCache(path)
+    ctx = mp.get_context("spawn")
+    procs = [ctx.Process(target=_writer, args=(path, w, 200)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(30)
+        assert p.exitcode == 0
+    assert len(SharedCache(path)) == 800
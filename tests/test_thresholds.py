@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from sklearn.metrics import confusion_matrix, f1_score, precision_score, recall_score
+
+from thresholds import confusion_at, metrics_at, select_threshold
+
+# Repeated scores so several thresholds land exactly on a tie.
+PROBA = np.array([0.1, 0.3, 0.3, 0.5, 0.5, 0.5, 0.7, 0.9, 0.9, 0.2])
+Y = np.array([0, 0, 1, 0, 1, 1, 1, 1, 0, 0])
+THRESHOLDS = [0.0, 0.1, 0.25, 0.3, 0.5, 0.6, 0.9, 1.0]
+
+
+def _sklearn(proba, y, t):
+    pred = (proba >= t).astype(int)
+    kw = {"zero_division": 0}
+    tn, fp, fn, tp = confusion_matrix(y, pred, labels=[0, 1]).ravel()
+    return {
+        "tp": tp,
+        "fp": fp,
+        "fn": fn,
+        "tn": tn,
+        "precision": precision_score(y, pred, **kw),
+        "recall": recall_score(y, pred, **kw),
+        "macro_f1": f1_score(y, pred, average="macro", **kw),
+    }
+
+
+@pytest.mark.parametrize(
+    "proba, y",
+    [
+        (PROBA, Y),
+        (PROBA, np.ones_like(Y)),
+        (PROBA, np.zeros_like(Y)),
+        (np.full(6, 0.5), np.array([0, 1, 0, 1, 1, 0])),
+    ],
+    ids=["mixed", "all-positive", "all-negative", "all-tied"],
+)
+def test_metrics_at_matches_sklearn(proba, y):
+    curves = metrics_at(proba, y, THRESHOLDS)
+    c = confusion_at(proba, y, THRESHOLDS)
+    for i, t in enumerate(THRESHOLDS):
+        expected = _sklearn(proba, y, t)
+        for name in ("tp", "fp", "fn", "tn"):
+            assert c[name][i] == expected[name], (t, name)
+        for name in ("precision", "recall", "macro_f1"):
+            assert curves[name][i] == pytest.approx(expected[name]), (t, name)
+
+
+def test_select_threshold_ties_go_to_lowest():
+    curves = {"macro_f1": np.array([0.5, 0.8, 0.8, 0.7])}
+    t, score = select_threshold(curves, np.array([0.2, 0.4, 0.6, 0.8]))
+    assert (t, score) == (0.4, 0.8)
@@ -0,0 +1,82 @@
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import TfidfTransformer
+from sklearn.pipeline import Pipeline
+
+import app.predict as predict
+import train
+from app.engine import compile_pipeline
+
+TEXTS = [
+    "you are an idiot",
+    "thanks for the helpful review",
+    "shut up you stupid moron",
+    "great patch, merging now",
+    "this code is trash and so are you",
+    "nice work on the tests",
+    "i hate you",
+    "could you add a docstring here",
+    "what a stupid idea",
+    "looks good to me",
+    "you moron",
+]
+
+
+@pytest.fixture
+def stream_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(train, "MODELS", tmp_path / "models")
+    (tmp_path / "models").mkdir()
+    labels = [1, 0, 1, 0, 1, 0, 1, 0, 1, 0, 1]
+    pd.DataFrame({"text": TEXTS, "label": labels}).to_csv("train.csv", index=False)
+    pd.DataFrame({"text": TEXTS[:6], "label": labels[:6]}).to_csv(
+        "val.csv", index=False
+    )
+    return tmp_path
+
+
+def test_fit_idf_matches_batch_tfidf(stream_dir):
+    (_, hasher), _ = train.build_features("hashing", n_bits=10)
+    tfidf, class_weight, n = train.fit_idf(hasher, ["train.csv"], chunk_size=3)
+    batch = TfidfTransformer().fit(hasher.transform(TEXTS))
+    np.testing.assert_allclose(tfidf.idf_, batch.idf_)
+    assert n == len(TEXTS)
+    assert class_weight == {0: 11 / 10, 1: 11 / 12}
+
+
+def test_stream_model_scores_like_batch_pipeline_and_serves(stream_dir, monkeypatch):
+    train.main_stream(
+        ["train.csv"], val_path="val.csv", n_bits=10, epochs=2, chunk_size=4
+    )
+    meta_path = stream_dir / "models" / "metadata.json"
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    pipe = joblib.load(meta["model_file"])
+    hasher, _, clf = pipe.named_steps.values()
+
+    # Same hasher vocabulary + batch-fitted IDF + the streamed classifier.
+    batch = Pipeline(
+        [
+            ("hash", hasher),
+            ("tfidf", TfidfTransformer().fit(hasher.transform(TEXTS))),
+            ("clf", clf),
+        ]
+    )
+    expected = batch.predict_proba(TEXTS)[:, 1]
+    np.testing.assert_allclose(pipe.predict_proba(TEXTS)[:, 1], expected)
+    np.testing.assert_allclose(
+        compile_pipeline(pipe).predict_proba(TEXTS)[:, 1], expected, atol=1e-9
+    )
+
+    monkeypatch.setattr(predict, "_METADATA_PATH", meta_path)
+    before = predict.current_state()
+    try:
+        state = predict.reload_model()
+        assert state.version == meta["created"] and not state.apply_clean
+        probs = [r["prob"] for r in predict.predict_batch(TEXTS)]
+        np.testing.assert_allclose(probs, expected, atol=1e-4)
+    finally:
+        predict._swap(before)
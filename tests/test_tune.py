@@ -0,0 +1,31 @@
+import csv
+
+import tune
+
+
+def test_history_migrates_legacy_three_column_file(tmp_path, capsys):
+    hist = tmp_path / "history.csv"
+    hist.write_text(
+        "timestamp,val_macro_f1,best_params\n"
+        '20251105_1941,1.00000,"{"clf__C": 0.5, "tfidf__ngram_range": [1, 1]}"\n'
+        "garbage-without-commas\n"
+        "\n"
+        '20251105_1949,0.90000,"{"clf__C": 2.0}"\n',
+        encoding="utf-8",
+    )
+    tune._history_header(hist)
+
+    with open(hist, encoding="utf-8", newline="") as h:
+        rows = list(csv.reader(h))
+    assert rows[0] == tune.HISTORY_COLUMNS
+    assert all(len(r) == len(tune.HISTORY_COLUMNS) for r in rows)
+    assert [r[:3] for r in rows[1:]] == [
+        ["20251105_1941", "1.00000", '{"clf__C": 0.5, "tfidf__ngram_range": [1, 1]}'],
+        ["20251105_1949", "0.90000", '{"clf__C": 2.0}'],
+    ]
+    assert "skipping malformed" in capsys.readouterr().err
+    assert not (tmp_path / "history.csv.tmp").exists()
+
+    before = hist.read_bytes()
+    tune._history_header(hist)
+    assert hist.read_bytes() == before
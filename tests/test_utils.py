@@ -18,3 +18,42 @@ def test_clean_text_emoji():
     s = "nice 😊"
     out = clean_text(s)
     assert "<emoji>" in out.lower() or "<emoji" in out.upper() or "<emoji>" in out
+
+
+def _golden_corpus():
+    import pandas as pd
+    from pathlib import Path
+
+    texts = []
+    for path in sorted(Path("data/processed").glob("*.csv")):
+        texts.extend(pd.read_csv(path)["text"].astype(str).tolist())
+    return texts
+
+
+def test_clean_text_matches_soup_on_golden_corpus():
+    from app.utils import _clean_text_soup
+
+    texts = _golden_corpus()
+    assert texts
+    for s in texts:
+        assert clean_text(s) == _clean_text_soup(s)
+
+
+def test_clean_text_markup_matches_soup():
+    from app.utils import _clean_text_soup
+
+    cases = [
+        "<b>Hi</b> there",
+        "a</b>c<br/>d",
+        "<p class='x' id=\"y\">text</p>",
+        "x &amp; y &lt;3 &#65;&#x42; &nbsp;z",
+        "&notanentity; &Dagger;",
+        "<3 you & me, a < b",
+        "a<script>var x = 1;</script>b",
+        "a<!-- hidden -->b",
+        "AT&T <b>nice 😊</b>",
+        "<a href='x>y'>link</a>",
+        "&#128; &#0; tail&",
+    ]
+    for s in cases:
+        assert clean_text(s) == _clean_text_soup(s), s